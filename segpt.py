@@ -12,6 +12,7 @@ Features:
 - Professional Excel formatting
 - Error handling and logging
 - Popup notifications
+- Command line interface with a headless mode (see --help)
 
 Author: Security Team
 Version: 2.2
@@ -19,15 +20,39 @@ Version: 2.2
 
 import os
 import sys
+import csv
+import glob
 import logging
-import pandas as pd
+import argparse
 import re
+import json
+import zlib
+import mmap
+import socket
+import struct
+import time
+import cProfile
+import hashlib
+import itertools
+import ipaddress
+import tracemalloc
+import multiprocessing
 import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-import tkinter as tk
-from tkinter import messagebox
+from xml.sax.saxutils import unescape
+
+# numpy, openpyxl, pyarrow and tkinter are imported inside the stages that need
+# them, so the (frozen) converter starts fast and headless runs never load Tk
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then left out of run reports
+    resource = None
 
 # Configure logging
 logging.basicConfig(
@@ -37,6 +62,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Popups are shown unless the converter runs headless (--no-gui)
+GUI_ENABLED = True
+
 # Fallback port services mapping for cases where service name is not detected
 PORT_SERVICES = {
     1: "TCPMUX", 5: "RJE", 7: "ECHO", 9: "DISCARD", 11: "SYSTAT", 13: "DAYTIME", 17: "QOTD", 18: "MSP",
@@ -84,29 +112,233 @@ PORT_SERVICES = {
     10001: "SNET-SENSOR-MGMT", 32768: "FILENET-TMS", 49152: "UNKNOWN-49152"
 }
 
-def get_fallback_service_name(port):
+# Service index over every (protocol, port), built from Nmap's nmap-services table
+SERVICE_PROTOCOLS = ('tcp', 'udp', 'sctp')
+SERVICE_INDEX_VERSION = 2
+SERVICE_INDEX_MAGIC = b'SEGPTSI1'
+SERVICE_INDEX_FILENAME = 'services.idx'
+NMAP_SERVICES_LOCATIONS = (
+    '/usr/share/nmap/nmap-services',
+    '/usr/local/share/nmap/nmap-services',
+    '/opt/homebrew/share/nmap/nmap-services',
+    r'C:\Program Files (x86)\Nmap\nmap-services',
+    r'C:\Program Files\Nmap\nmap-services'
+)
+
+def port_range_name(port):
+    """Return the IANA range bucket of a port number."""
+    if 0 <= port <= 1023:
+        return "RESERVED"
+    elif 1024 <= port <= 49151:
+        return "REGISTERED"
+    elif 49152 <= port <= 65535:
+        return "DYNAMIC/PRIVATE"
+    else:
+        return "INVALID"
+
+def find_nmap_services_file():
+    """Return the path of Nmap's nmap-services table, or None if Nmap is not installed.
+    
+    $NMAPDIR and the program folder are searched before the usual install locations.
+    """
+    candidates = []
+    if os.environ.get('NMAPDIR'):
+        candidates.append(os.path.join(os.environ['NMAPDIR'], 'nmap-services'))
+    candidates.append(os.path.join(program_directory(), 'nmap-services'))
+    candidates.extend(NMAP_SERVICES_LOCATIONS)
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def read_nmap_services(file_path):
+    """Read an nmap-services table into {(protocol, port): name}, keeping the most frequent name per port."""
+    entries = {}
+    frequencies = {}
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if len(fields) < 2 or fields[0] == 'unknown':
+                continue
+            port, _, protocol = fields[1].partition('/')
+            if protocol not in SERVICE_PROTOCOLS or not port.isdigit() or int(port) > 65535:
+                continue
+            try:
+                frequency = float(fields[2]) if len(fields) > 2 else 0.0
+            except ValueError:
+                frequency = 0.0
+            key = (protocol, int(port))
+            if frequency >= frequencies.get(key, -1.0):
+                entries[key] = fields[0].upper()
+                frequencies[key] = frequency
+    return entries
+
+class ServiceIndex:
+    """Service name of every port for each protocol, as one flat array of name codes.
+    
+    Row `p` of the array holds the 65,536 name codes of SERVICE_PROTOCOLS[p], so
+    a lookup is a single index operation, and whole columns of ports are looked
+    up at once with numpy. Ports without a registered name map to their range
+    bucket (RESERVED, REGISTERED, DYNAMIC/PRIVATE).
+    
+    Names come from the nmap-services table when one is found. PORT_SERVICES
+    keeps precedence for TCP so existing report names stay stable, and fills
+    in ports the table does not list for a protocol.
+    """
+    
+    def __init__(self, names, codes, signature=None):
+        self.names = names
+        self.codes = codes
+        # Identifies the source table; parse cache entries are only valid for the same one
+        self.signature = signature
+    
+    @classmethod
+    def build(cls, services_file=None):
+        """Build the index from an nmap-services table (or PORT_SERVICES alone)."""
+        entries = read_nmap_services(services_file) if services_file else {}
+        names = ["RESERVED", "REGISTERED", "DYNAMIC/PRIVATE"]
+        name_codes = {name: code for code, name in enumerate(names)}
+        
+        def name_code(name):
+            code = name_codes.get(name)
+            if code is None:
+                code = name_codes[name] = len(names)
+                names.append(name)
+            return code
+        
+        buckets = array('H', [0]) * 1024 + array('H', [1]) * (49152 - 1024) + array('H', [2]) * (65536 - 49152)
+        codes = array('H' if len(entries) + len(PORT_SERVICES) < 65536 - len(names) else 'I')
+        for protocol in SERVICE_PROTOCOLS:
+            row = array(codes.typecode, buckets)
+            for port, name in PORT_SERVICES.items():
+                if protocol == 'tcp' or (protocol, port) not in entries:
+                    # Reports show service names upper-cased (e.g. UPnP -> UPNP)
+                    row[port] = name_code(name.upper())
+            for (entry_protocol, port), name in entries.items():
+                if entry_protocol == protocol and not (protocol == 'tcp' and port in PORT_SERVICES):
+                    row[port] = name_code(name)
+            codes.extend(row)
+        
+        return cls(names, codes, cls.source_signature(services_file) if services_file else None)
+    
+    @staticmethod
+    def source_signature(services_file):
+        """Return the path, size and mtime identifying an nmap-services table."""
+        stat = os.stat(services_file)
+        return f"{os.path.abspath(services_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    @classmethod
+    def load(cls, index_file):
+        """Read a compiled index written by save(), or return None."""
+        try:
+            with open(index_file, 'rb') as f:
+                if f.read(len(SERVICE_INDEX_MAGIC)) != SERVICE_INDEX_MAGIC:
+                    return None
+                (metadata_length,) = struct.unpack('<I', f.read(4))
+                metadata = json.loads(f.read(metadata_length).decode('utf-8'))
+                if metadata.get('version') != SERVICE_INDEX_VERSION:
+                    return None
+                codes = array(metadata['typecode'])
+                codes.frombytes(f.read())
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        if len(codes) != len(SERVICE_PROTOCOLS) * 65536:
+            return None
+        return cls(metadata['names'], codes, metadata['signature'])
+    
+    def save(self, index_file):
+        """Atomically write the compiled index."""
+        metadata = json.dumps({
+            'version': SERVICE_INDEX_VERSION,
+            'signature': self.signature,
+            'typecode': self.codes.typecode,
+            'names': self.names
+        }).encode('utf-8')
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        temp_path = f"{index_file}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(SERVICE_INDEX_MAGIC)
+            f.write(struct.pack('<I', len(metadata)))
+            f.write(metadata)
+            f.write(self.codes.tobytes())
+        os.replace(temp_path, index_file)
+    
+    @staticmethod
+    def protocol_row(protocol):
+        """Return the array row of a protocol (unknown protocols use TCP's)."""
+        try:
+            return SERVICE_PROTOCOLS.index(protocol.lower())
+        except ValueError:
+            return 0
+    
+    def lookup(self, protocol, port):
+        """Return the service name of one (protocol, port)."""
+        return self.names[self.codes[self.protocol_row(protocol) * 65536 + port]]
+    
+    def lookup_codes(self, protocols, protocol_codes, ports):
+        """Return the name codes for whole columns of (protocol code, port) at once.
+        
+        `protocols` labels the values of the `protocol_codes` array; the result
+        indexes self.names.
+        """
+        import numpy as np
+        
+        rows = np.array([self.protocol_row(protocol) for protocol in protocols], dtype=np.int64)
+        flat = rows[np.asarray(protocol_codes, dtype=np.int64)] * 65536 + np.asarray(ports, dtype=np.int64)
+        return np.frombuffer(self.codes, dtype=self.codes.typecode)[flat]
+
+_loaded_service_index = None
+
+def get_service_index():
+    """Return the process-wide ServiceIndex, loading or compiling it on first use.
+    
+    The index compiled from nmap-services is kept in the program's .segpt_cache
+    folder and rebuilt when the table changes.
+    """
+    global _loaded_service_index
+    if _loaded_service_index is not None:
+        return _loaded_service_index
+    
+    services_file = find_nmap_services_file()
+    if services_file is None:
+        _loaded_service_index = ServiceIndex.build()
+        return _loaded_service_index
+    
+    index_file = os.path.join(program_directory(), PARSE_CACHE_DIRNAME, SERVICE_INDEX_FILENAME)
+    index = ServiceIndex.load(index_file)
+    if index is None or index.signature != ServiceIndex.source_signature(services_file):
+        logger.info(f"Compiling service index from {services_file}")
+        index = ServiceIndex.build(services_file)
+        try:
+            index.save(index_file)
+        except OSError as e:
+            logger.warning(f"Could not save service index {index_file}: {e}")
+    _loaded_service_index = index
+    return _loaded_service_index
+
+def get_fallback_service_name(port, protocol='tcp'):
     """Returns the fallback service name for a given port if nmap didn't detect it."""
     try:
         port = int(port)
         
-        if port in PORT_SERVICES:
-            return PORT_SERVICES[port]
+        if not 0 <= port <= 65535:
+            return port_range_name(port)
         
-        if 0 <= port <= 1023:
-            return "RESERVED"
-        elif 1024 <= port <= 49151:
-            return "REGISTERED"
-        elif 49152 <= port <= 65535:
-            return "DYNAMIC/PRIVATE"
-        else:
-            return "INVALID"
+        return get_service_index().lookup(protocol, port)
             
     except (ValueError, TypeError):
         return "UNKNOWN"
 
 def show_popup_message(title, message, message_type="info"):
-    """Show popup message using tkinter."""
+    """Show popup message using tkinter (printed to the console when headless)."""
+    if not GUI_ENABLED:
+        print(f"{title}: {message}")
+        return
+    
     try:
+        import tkinter as tk
+        from tkinter import messagebox
+        
         # Create root window but hide it
         root = tk.Tk()
         root.withdraw()
@@ -123,184 +355,945 @@ def show_popup_message(title, message, message_type="info"):
         # Fallback to console if GUI not available
         print(f"{title}: {message}")
 
-def parse_gnmap_file(file_path):
-    """Parse .gnmap (greppable) format and extract actual service names."""
-    results = []
+class ScanResults:
+    """Compact column store for open-port rows.
     
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            if line.startswith('Host:') and 'Ports:' in line:
-                # Extract IP address
-                ip_match = re.search(r'Host:\s+(\S+)', line)
-                if not ip_match:
-                    continue
+    Repeated strings (hosts, protocols, services) are interned into lookup
+    tables and each row only holds small integer codes in typed arrays, so
+    millions of open ports cost a few bytes each and reports are built from
+    whole columns without a Python object per row. It also pickles to a
+    compact payload when handed back from worker processes.
+    """
+    
+    def __init__(self):
+        # Interned per-host tables; addresses are packed to (IP version, integer)
+        self.hosts = []
+        self.hostnames = []
+        self.host_versions = array('B')
+        self.host_numbers = []
+        self.protocols = []
+        self.services = []
+        
+        # Per-row columns
+        self.host_codes = array('I')
+        self.ports = array('H')
+        self.protocol_codes = array('B')
+        self.service_codes = array('I')
+        
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """(Re)build the string -> code lookups for the interned tables."""
+        self._host_index = {host: code for code, host in enumerate(self.hosts)}
+        self._protocol_index = {protocol: code for code, protocol in enumerate(self.protocols)}
+        self._service_index = {service: code for code, service in enumerate(self.services)}
+    
+    def __getstate__(self):
+        # The lookups are derived from the tables, no need to ship them
+        state = self.__dict__.copy()
+        for key in ('_host_index', '_protocol_index', '_service_index'):
+            del state[key]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_indexes()
+    
+    def __len__(self):
+        return len(self.ports)
+    
+    def __iter__(self):
+        """Yield rows as dicts, matching the parsers' historical output."""
+        for host_code, port, protocol_code, service_code in zip(
+            self.host_codes, self.ports, self.protocol_codes, self.service_codes
+        ):
+            yield {
+                'Host': self.hosts[host_code],
+                'Port': port,
+                'Protocol': self.protocols[protocol_code],
+                'Service': self.services[service_code],
+                'State': 'open',
+                'Hostname': self.hostnames[host_code]
+            }
+    
+    def host_code(self, host, hostname=''):
+        """Return the code for a host, interning it (and its packed address) on first use."""
+        code = self._host_index.get(host)
+        if code is None:
+            code = len(self.hosts)
+            self._host_index[host] = code
+            self.hosts.append(host)
+            self.hostnames.append(hostname)
+            try:
+                # IPv4 literals are packed by the C resolver; ipaddress handles the rest
+                self.host_numbers.append(int.from_bytes(socket.inet_pton(socket.AF_INET, host), 'big'))
+                self.host_versions.append(4)
+            except (OSError, ValueError):
+                try:
+                    address = ipaddress.ip_address(host)
+                    self.host_versions.append(address.version)
+                    self.host_numbers.append(int(address))
+                except ValueError:
+                    # Not an IP literal, order after all addresses
+                    self.host_versions.append(0)
+                    self.host_numbers.append(0)
+        elif hostname and not self.hostnames[code]:
+            self.hostnames[code] = hostname
+        return code
+    
+    def service_code(self, service):
+        """Return the code for a service name, interning it on first use."""
+        code = self._service_index.get(service)
+        if code is None:
+            code = self._service_index[service] = len(self.services)
+            self.services.append(service)
+        return code
+    
+    def append(self, host, port, protocol, service, hostname=''):
+        """Add one open-port row."""
+        self.append_host(host, [(port, protocol, service)], hostname)
+    
+    def append_host(self, host, ports, hostname=''):
+        """Add a host's open ports given as (port, protocol, service) tuples."""
+        host_code = self.host_code(host, hostname)
+        for port, protocol, service in ports:
+            protocol_code = self._protocol_index.get(protocol)
+            if protocol_code is None:
+                protocol_code = self._protocol_index[protocol] = len(self.protocols)
+                self.protocols.append(protocol)
+            service_code = self.service_code(service)
+            
+            self.host_codes.append(host_code)
+            self.ports.append(port)
+            self.protocol_codes.append(protocol_code)
+            self.service_codes.append(service_code)
+    
+    def resolve_services(self, service_index=None):
+        """Name the rows whose service Nmap did not report ('') after their (protocol, port).
+        
+        All such rows are looked up in one vectorized pass over the service index.
+        """
+        missing = self._service_index.get('')
+        if missing is None:
+            return
+        
+        import numpy as np
+        
+        if service_index is None:
+            service_index = get_service_index()
+        service_codes = np.array(self.service_codes, dtype=np.int64)
+        rows = np.flatnonzero(service_codes == missing)
+        if not len(rows):
+            return
+        
+        name_codes = service_index.lookup_codes(
+            self.protocols,
+            np.frombuffer(self.protocol_codes, dtype=np.uint8)[rows],
+            np.frombuffer(self.ports, dtype=np.uint16)[rows]
+        )
+        used_codes, inverse = np.unique(name_codes, return_inverse=True)
+        store_codes = np.array(
+            [self.service_code(service_index.names[code]) for code in used_codes.tolist()], dtype=np.int64
+        )
+        service_codes[rows] = store_codes[inverse]
+        self.service_codes = array('I', service_codes.astype(np.uint32).tobytes())
+    
+    def extend(self, other):
+        """Append all rows of another store, remapping its codes onto this one."""
+        if not len(other):
+            return
+        
+        host_map = [self.host_code(host, hostname) for host, hostname in zip(other.hosts, other.hostnames)]
+        protocol_map = []
+        for protocol in other.protocols:
+            if protocol not in self._protocol_index:
+                self._protocol_index[protocol] = len(self.protocols)
+                self.protocols.append(protocol)
+            protocol_map.append(self._protocol_index[protocol])
+        service_map = [self.service_code(service) for service in other.services]
+        
+        self.host_codes.extend(array('I', map(host_map.__getitem__, other.host_codes)))
+        self.ports.extend(other.ports)
+        self.protocol_codes.extend(array('B', map(protocol_map.__getitem__, other.protocol_codes)))
+        self.service_codes.extend(array('I', map(service_map.__getitem__, other.service_codes)))
+    
+    def truncate(self, length):
+        """Drop rows past `length` (interned tables are left as they are)."""
+        del self.host_codes[length:]
+        del self.ports[length:]
+        del self.protocol_codes[length:]
+        del self.service_codes[length:]
+    
+    def to_bytes(self):
+        """Serialise the store to a compact binary payload (see from_bytes)."""
+        tables = json.dumps({
+            'hosts': self.hosts,
+            'hostnames': self.hostnames,
+            'protocols': self.protocols,
+            'services': self.services
+        }).encode('utf-8')
+        columns = [self.host_codes, self.ports, self.protocol_codes, self.service_codes]
+        
+        parts = [struct.pack('<I', len(tables)), tables]
+        for column in columns:
+            data = column.tobytes()
+            parts.append(struct.pack('<Q', len(data)))
+            parts.append(data)
+        return zlib.compress(b''.join(parts), 1)
+    
+    @classmethod
+    def from_bytes(cls, payload):
+        """Rebuild a store from the output of to_bytes."""
+        data = memoryview(zlib.decompress(payload))
+        (tables_length,) = struct.unpack_from('<I', data, 0)
+        offset = 4
+        tables = json.loads(bytes(data[offset:offset + tables_length]).decode('utf-8'))
+        offset += tables_length
+        
+        results = cls()
+        for host, hostname in zip(tables['hosts'], tables['hostnames']):
+            results.host_code(host, hostname)
+        results.protocols = tables['protocols']
+        results.services = tables['services']
+        results._build_indexes()
+        
+        for column in (results.host_codes, results.ports, results.protocol_codes, results.service_codes):
+            (length,) = struct.unpack_from('<Q', data, offset)
+            offset += 8
+            column.frombytes(data[offset:offset + length])
+            offset += length
+        return results
+
+def parse_gnmap_line(line):
+    """Parse one .gnmap host line into (ip, hostname, open ports), or None if it lists no ports."""
+    if not (line.startswith('Host:') and 'Ports:' in line):
+        return None
+    
+    # Extract IP address and the hostname nmap prints in parentheses
+    ip_match = re.search(r'Host:\s+(\S+)(?:\s+\(([^)]*)\))?', line)
+    if not ip_match:
+        return None
+        
+    ip = ip_match.group(1)
+    hostname = ip_match.group(2) or ''
+    
+    # Extract ports section
+    ports_match = re.search(r'Ports:\s+(.+?)(?:\s+Ignored|$)', line)
+    if not ports_match:
+        return None
+        
+    ports_section = ports_match.group(1)
+    
+    # Parse individual ports
+    ports = []
+    port_entries = ports_section.split(',')
+    for entry in port_entries:
+        entry = entry.strip()
+        if not entry:
+            continue
+            
+        # Parse port entry: port/state/protocol/owner/service/SunRPC/version
+        parts = entry.split('/')
+        if len(parts) >= 5:
+            port = parts[0].strip()
+            state = parts[1].strip()
+            protocol = parts[2].strip()
+            service = parts[4].strip() if len(parts) > 4 else ''
+            
+            if state == 'open':
+                try:
+                    port_num = int(port)
+                    # Use actual service name from nmap; unknown ones are resolved in bulk
+                    if service in ['unknown', '?']:
+                        service = ''
                     
-                ip = ip_match.group(1)
+                    ports.append((port_num, protocol, service.upper()))
+                except ValueError:
+                    continue
+    
+    return ip, hostname, ports
+
+# Bytes-level .gnmap patterns: the host of a line, its Ports field and the open entries in it
+GNMAP_PORTS_PATTERN = re.compile(rb'Ports:[ \t]+([^\t\n]*)')
+GNMAP_OPEN_PORT_PATTERN = re.compile(rb'(?:^|,)\s*(\d+)/open/([^/,]*)/[^/,]*/([^/,]*)/')
+GNMAP_HOST_PATTERN = re.compile(rb'Host:\s+(\S+)(?:[ \t]+\(([^)\n]*)\))?')
+GNMAP_MIN_RANGE_BYTES = 32 * 1024 * 1024
+
+def gnmap_line_ranges(file_path, count):
+    """Split a file into up to `count` (start, stop) byte ranges that begin and end on line boundaries."""
+    size = os.path.getsize(file_path)
+    count = max(1, min(count, size // GNMAP_MIN_RANGE_BYTES))
+    if count == 1:
+        return [(0, size)]
+    
+    boundaries = [0]
+    with open(file_path, 'rb') as f:
+        for index in range(1, count):
+            f.seek(max(size * index // count, boundaries[-1]))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+    boundaries.append(size)
+    return [(start, stop) for start, stop in zip(boundaries, boundaries[1:]) if stop > start]
+
+def parse_gnmap_file(file_path, results=None, start=0, stop=None):
+    """Parse .gnmap (greppable) format and extract actual service names.
+    
+    Rows are appended to `results` (a new ScanResults by default), which is returned.
+    The file is memory-mapped and scanned as bytes: the search jumps straight
+    from one "/open/" entry to the next, so status lines and hosts without open
+    ports are skipped without being looked at in Python, and only the kept
+    fields are decoded.
+    `start`/`stop` restrict parsing to a line-aligned byte range (see
+    gnmap_line_ranges) so one large file can be parsed by several workers.
+    """
+    if results is None:
+        results = ScanResults()
+    
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        stop = size if stop is None else min(stop, size)
+        if stop <= start:
+            return results
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Decoded protocol/service names, shared by all rows of the file
+            protocols = {}
+            services = {}
+            
+            position = start
+            while True:
+                # Jump to the next line that mentions an open port
+                hit = data.find(b'/open/', position, stop)
+                if hit < 0:
+                    break
+                # A range's first line has no newline before it inside the range
+                line_start = data.rfind(b'\n', start, hit) + 1 or start
+                line_end = data.find(b'\n', hit, stop)
+                if line_end < 0:
+                    line_end = stop
+                position = line_end + 1
                 
-                # Extract ports section
-                ports_match = re.search(r'Ports:\s+(.+?)(?:\s+Ignored|$)', line)
-                if not ports_match:
+                ports_match = GNMAP_PORTS_PATTERN.search(data, line_start, line_end)
+                if ports_match is None:
+                    continue
+                ports = []
+                section = ports_match.group(1)
+                for port, protocol, service in GNMAP_OPEN_PORT_PATTERN.findall(section):
+                    protocol_name = protocols.get(protocol)
+                    if protocol_name is None:
+                        protocol_name = protocols[protocol] = protocol.strip().decode('utf-8', errors='ignore')
+                    service_name = services.get(service)
+                    if service_name is None:
+                        # Use actual service name from nmap; unknown ones are resolved in bulk
+                        service_name = service.strip().decode('utf-8', errors='ignore')
+                        if service_name in ['unknown', '?']:
+                            service_name = ''
+                        service_name = services[service] = service_name.upper()
+                    ports.append((int(port), protocol_name, service_name))
+                if not ports:
                     continue
-                    
-                ports_section = ports_match.group(1)
                 
-                # Parse individual ports
-                port_entries = ports_section.split(',')
-                for entry in port_entries:
-                    entry = entry.strip()
-                    if not entry:
-                        continue
-                        
-                    # Parse port entry: port/state/protocol/owner/service/SunRPC/version
-                    parts = entry.split('/')
-                    if len(parts) >= 5:
-                        port = parts[0].strip()
-                        state = parts[1].strip()
-                        protocol = parts[2].strip()
-                        service = parts[4].strip() if len(parts) > 4 else ''
-                        
-                        if state == 'open':
-                            try:
-                                port_num = int(port)
-                                # Use actual service name from nmap, fallback if empty or unknown
-                                if not service or service in ['', 'unknown', '?']:
-                                    service = get_fallback_service_name(port_num)
-                                
-                                results.append({
-                                    'Host': ip,
-                                    'Port': port_num,
-                                    'Protocol': protocol,
-                                    'Service': service.upper(),
-                                    'State': state
-                                })
-                            except ValueError:
-                                continue
+                host_match = GNMAP_HOST_PATTERN.match(data, line_start, ports_match.start())
+                if host_match is None:
+                    continue
+                hostname = host_match.group(2)
+                results.append_host(
+                    host_match.group(1).decode('utf-8', errors='ignore'), ports,
+                    hostname.decode('utf-8', errors='ignore') if hostname else ''
+                )
     
+    results.resolve_services()
     return results
 
-def parse_xml_file(file_path):
-    """Parse .xml format and extract actual service names."""
-    results = []
+def xml_host_record(elem):
+    """Read a finished <host> element into (ip, hostname, open ports), or None without an address."""
+    # Get IP address, IPv6 targets only carry an ipv6 address
+    address_elem = elem.find('.//address[@addrtype="ipv4"]')
+    if address_elem is None:
+        address_elem = elem.find('.//address[@addrtype="ipv6"]')
+    if address_elem is None:
+        return None
     
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        for host in root.findall('.//host'):
-            # Get IP address
-            address_elem = host.find('.//address[@addrtype="ipv4"]')
-            if address_elem is None:
-                continue
-                
-            ip = address_elem.get('addr')
+    ip = address_elem.get('addr')
+    hostname_elem = elem.find('hostnames/hostname')
+    hostname = hostname_elem.get('name', '') if hostname_elem is not None else ''
+    ports = []
+    
+    # Get open ports
+    for port in elem.iter('port'):
+        state_elem = port.find('state')
+        if state_elem is not None and state_elem.get('state') == 'open':
+            port_num = int(port.get('portid'))
+            protocol = port.get('protocol')
             
-            # Get open ports
-            for port in host.findall('.//port'):
-                state_elem = port.find('state')
-                if state_elem is not None and state_elem.get('state') == 'open':
-                    port_num = int(port.get('portid'))
-                    protocol = port.get('protocol')
-                    
-                    # Extract service name from XML
-                    service_elem = port.find('service')
-                    if service_elem is not None:
-                        service = service_elem.get('name', '')
-                        # Also check for product info
-                        product = service_elem.get('product', '')
-                        if product and product != service:
-                            service = f"{service} ({product})" if service else product
-                    else:
-                        service = ''
-                    
-                    # Use fallback if no service detected
-                    if not service or service in ['', 'unknown', '?']:
-                        service = get_fallback_service_name(port_num)
-                    
-                    results.append({
-                        'Host': ip,
-                        'Port': port_num,
-                        'Protocol': protocol,
-                        'Service': service.upper(),
-                        'State': 'open'
-                    })
+            # Extract service name from XML
+            service_elem = port.find('service')
+            if service_elem is not None:
+                service = service_elem.get('name', '')
+                # Also check for product info
+                product = service_elem.get('product', '')
+                if product and product != service:
+                    service = f"{service} ({product})" if service else product
+            else:
+                service = ''
+            
+            # Unknown services are resolved in bulk from the service index
+            if service in ['unknown', '?']:
+                service = ''
+            
+            ports.append((port_num, protocol, service.upper()))
+    
+    return ip, hostname, ports
+
+def iter_xml_hosts(file_path):
+    """Stream an .xml file host by host, yielding (ip, hostname, open ports) per <host>.
+
+    Uses incremental parsing and clears each finished <host> element so memory
+    stays flat regardless of the size of the scan.
+    """
+    context = ET.iterparse(file_path, events=('start', 'end'))
+    root = None
+    
+    for event, elem in context:
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+        
+        if elem.tag != 'host':
+            continue
+        
+        record = xml_host_record(elem)
+        if record is not None:
+            yield record
+        
+        # Drop the finished host (and anything before it) from the tree
+        root.clear()
+
+def parse_xml_file(file_path, results=None):
+    """Parse .xml format and extract actual service names.
+    
+    Rows are appended to `results` (a new ScanResults by default), which is returned.
+    """
+    if results is None:
+        results = ScanResults()
+    start = len(results)
+    
+    try:
+        for ip, hostname, ports in iter_xml_hosts(file_path):
+            if ports:
+                results.append_host(ip, ports, hostname)
                     
     except ET.ParseError as e:
         logger.error(f"Error parsing XML file {file_path}: {e}")
+        # A malformed document contributes no rows
+        results.truncate(start)
     except Exception as e:
         logger.error(f"Unexpected error parsing XML file {file_path}: {e}")
     
+    results.resolve_services()
     return results
 
-def parse_nmap_file(file_path):
-    """Parse .nmap (normal) format and extract actual service names."""
-    results = []
-    current_ip = None
+# Normal (.nmap) output patterns
+NMAP_REPORT_PATTERN = re.compile(r'Nmap scan report for (.+)')
+NMAP_TARGET_PATTERN = re.compile(r'(.+?) \(([^()]+)\)$')
+NMAP_PORT_PATTERN = re.compile(r'(\d+)/(tcp|udp|sctp)\s+open\s+(\S+)(?:\s+(.+))?')
+
+class NmapTextParser:
+    """Line-oriented state machine for .nmap (normal) output.
     
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        
-    # Find all host blocks
-    host_blocks = re.findall(r'Nmap scan report for ([^\n]+).*?(?=Nmap scan report for|\Z)', content, re.DOTALL)
+    Lines are fed one at a time; a host's open ports are returned once the
+    next host header (or the end of the file) shows that its block is complete,
+    so no more than one host is ever held in memory.
+    """
     
-    for block in host_blocks:
-        lines = block.split('\n')
+    def __init__(self):
+        self.current_host = None
+        self.current_hostname = ''
+        self.current_ports = []
+        self.in_port_section = False
+    
+    def feed(self, line):
+        """Consume one line; return (host, hostname, open ports) when a host block completes."""
+        line = line.strip()
         
-        # Extract IP from first line
-        ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', lines[0])
-        if not ip_match:
-            continue
-            
-        current_ip = ip_match.group(1)
+        # A new host header closes the previous host block
+        if line.startswith('Nmap scan report for '):
+            finished = self.close()
+            self._start_host(NMAP_REPORT_PATTERN.match(line).group(1).strip())
+            return finished
+        
+        if self.current_host is None:
+            return None
+        
+        # Check if we're in the port/state/service section
+        if line.startswith('PORT') and 'STATE' in line and 'SERVICE' in line:
+            self.in_port_section = True
+            return None
+        
+        if not self.in_port_section:
+            return None
+        
+        if not line:
+            # Empty line marks the end of the port section
+            self.in_port_section = False
+            return None
         
-        # Look for port information
-        in_port_section = False
-        for line in lines[1:]:
-            line = line.strip()
+        # Parse port line: "22/tcp   open  ssh     OpenSSH 7.4"
+        port_match = NMAP_PORT_PATTERN.match(line)
+        if port_match:
+            port_num = int(port_match.group(1))
+            protocol = port_match.group(2)
+            service = port_match.group(3)
+            version_info = port_match.group(4) if port_match.group(4) else ''
             
-            # Check if we're in the port/state/service section
-            if 'PORT' in line and 'STATE' in line and 'SERVICE' in line:
-                in_port_section = True
-                continue
-                
-            if in_port_section and line:
-                # Parse port line: "22/tcp   open  ssh     OpenSSH 7.4"
-                port_match = re.match(r'(\d+)/(tcp|udp)\s+open\s+(\S+)(?:\s+(.+))?', line)
-                if port_match:
-                    port_num = int(port_match.group(1))
-                    protocol = port_match.group(2)
-                    service = port_match.group(3) if port_match.group(3) else ''
-                    version_info = port_match.group(4) if port_match.group(4) else ''
-                    
-                    # Combine service with version info if available
-                    if version_info and version_info.strip():
-                        service = f"{service} ({version_info.strip()})"
-                    
-                    # Use fallback if no service detected
-                    if not service or service in ['', 'unknown', '?']:
-                        service = get_fallback_service_name(port_num)
-                    
-                    results.append({
-                        'Host': current_ip,
-                        'Port': port_num,
-                        'Protocol': protocol,
-                        'Service': service.upper(),
-                        'State': 'open'
-                    })
-            elif in_port_section and not line:
-                # Empty line might indicate end of port section
-                in_port_section = False
+            # Combine service with version info if available
+            if version_info and version_info.strip():
+                service = f"{service} ({version_info.strip()})"
+            
+            # Unknown services are resolved in bulk from the service index
+            if service in ['unknown', '?']:
+                service = ''
+            
+            self.current_ports.append((port_num, protocol, service.upper()))
+        
+        return None
+    
+    def close(self):
+        """Finish the current host block, returning (host, hostname, open ports) or None."""
+        if self.current_host is None:
+            return None
+        
+        finished = (self.current_host, self.current_hostname, self.current_ports)
+        self.current_host = None
+        self.current_hostname = ''
+        self.current_ports = []
+        self.in_port_section = False
+        return finished
+    
+    def _start_host(self, target):
+        """Begin a host block from the target part of a report header."""
+        # "Nmap scan report for name (address)" or "Nmap scan report for address"
+        target_match = NMAP_TARGET_PATTERN.match(target)
+        if target_match:
+            self.current_hostname = target_match.group(1)
+            self.current_host = target_match.group(2)
+        else:
+            self.current_hostname = ''
+            self.current_host = target.split()[0]
+
+def iter_nmap_hosts(file_path):
+    """Stream an .nmap file line by line, yielding (host, hostname, open ports) per host."""
+    parser = NmapTextParser()
+    
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            finished = parser.feed(line)
+            if finished is not None:
+                yield finished
+    
+    finished = parser.close()
+    if finished is not None:
+        yield finished
+
+def parse_nmap_file(file_path, results=None):
+    """Parse .nmap (normal) format and extract actual service names.
     
+    Rows are appended to `results` (a new ScanResults by default), which is returned.
+    """
+    if results is None:
+        results = ScanResults()
+    
+    for host, hostname, ports in iter_nmap_hosts(file_path):
+        if ports:
+            results.append_host(host, ports, hostname)
+    
+    results.resolve_services()
     return results
 
-def style_excel_worksheet(worksheet):
-    """Apply professional styling to the Excel worksheet."""
-    # Define styles
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+# Column headers and fixed comment of the host-centric report sheet
+HOST_COLUMN = 'Address of Host (Hostname)'
+PORTS_COLUMN = 'Protocol/Port/Service/Status'
+COMMENTS_COLUMN = 'Comments'
+REPORT_COMMENT = (
+    "All ports on the target host which are not listed here were observed to be in state "
+    "as FILTERED. Port range scanned: 1-65534."
+)
+
+# Column headers of the port-, service- and host-centric summary sheets
+PORT_COLUMN = 'Protocol/Port'
+SERVICE_COLUMN = 'Service'
+SERVICES_COLUMN = 'Services'
+HOST_COUNT_COLUMN = 'Host Count'
+PORT_COUNT_COLUMN = 'Port Count'
+HOSTS_COLUMN = 'Hosts'
+
+# Excel limits: characters per cell and rows per sheet
+EXCEL_MAX_CELL_CHARS = 32767
+EXCEL_MAX_ROWS = 1048576
+
+def rank_codes(labels, key=None):
+    """Return an array giving each label's position in sorted order, indexed by label code."""
+    import numpy as np
+    
+    order = sorted(range(len(labels)), key=lambda code: labels[code] if key is None else key(code))
+    ranks = np.empty(len(labels), dtype=np.int64)
+    ranks[order] = np.arange(len(labels), dtype=np.int64)
+    return ranks
+
+def split_cell_text(text, max_chars):
+    """Split newline-separated lines into blocks of at most `max_chars` characters."""
+    blocks = []
+    block = []
+    length = 0
+    for line in text.split('\n'):
+        if block and length + 1 + len(line) > max_chars:
+            blocks.append('\n'.join(block))
+            block = []
+            length = 0
+        length += len(line) + (1 if block else 0)
+        block.append(line)
+    blocks.append('\n'.join(block))
+    # A single line longer than a cell is cut as a last resort
+    return [part[start:start + max_chars] for part in blocks for start in range(0, max(len(part), 1), max_chars)]
+
+def split_table_cells(table, column, label_column, max_chars):
+    """Continue cells of `column` longer than `max_chars` on extra rows labelled "(part i/n)" in `label_column`."""
+    if max(map(len, table[column]), default=0) <= max_chars:
+        return table
+    split = {header: [] for header in table}
+    for row in zip(*table.values()):
+        values = dict(zip(table, row))
+        parts = split_cell_text(values[column], max_chars)
+        for number, part in enumerate(parts, start=1):
+            for header, value in values.items():
+                if header == column:
+                    value = part
+                elif header == label_column and len(parts) > 1:
+                    value = f"{value} (part {number}/{len(parts)})"
+                split[header].append(value)
+    return split
+
+def distinct_sorted(keys):
+    """Sorted distinct values of an integer array (a sort and a neighbour comparison)."""
+    import numpy as np
+    
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]]
+
+def join_runs(labels, codes, starts, separator='\n'):
+    """Join labels[codes] into one string per run of rows, each run beginning at an index in `starts`.
+    
+    All rows are joined once and every run is sliced out of the joined text,
+    so the cost is one join no matter how many runs there are.
+    """
+    import numpy as np
+    
+    labels = np.asarray(labels, dtype=object)
+    label_lengths = np.fromiter(map(len, labels), dtype=np.int64, count=len(labels))
+    ends = np.cumsum(label_lengths[codes] + len(separator))
+    run_ends = np.r_[starts[1:], len(codes)]
+    text_starts = np.r_[0, ends][starts]
+    text_ends = ends[run_ends - 1] - len(separator)
+    text = separator.join(labels[codes])
+    return [text[start:end] for start, end in zip(text_starts.tolist(), text_ends.tolist())]
+
+class OpenPortIndex:
+    """Distinct open ports grouped by host, with port -> hosts and service -> hosts inverted indexes.
+    
+    Rows are ordered once with a single lexsort on integer keys (host by address
+    value, then protocol, numeric port and service) and duplicates are dropped
+    by comparing neighbours. The host report, the per-host port counts and the
+    per-port and per-service pivots are all cut from these arrays: each pivot is
+    one stable argsort of the already host-ordered rows, so the parsed results
+    are never scanned again.
+    """
+    
+    def __init__(self, results):
+        import numpy as np
+        
+        self.results = results
+        host_codes = np.frombuffer(results.host_codes, dtype=np.uint32).astype(np.int64)
+        ports = np.frombuffer(results.ports, dtype=np.uint16).astype(np.int64)
+        service_codes = np.frombuffer(results.service_codes, dtype=np.uint32).astype(np.int64)
+        
+        # Protocols are shown upper-cased, so 'tcp' and 'TCP' collapse to one code
+        self.protocol_labels = sorted({protocol.upper() for protocol in results.protocols})
+        protocol_map = np.array(
+            [self.protocol_labels.index(protocol.upper()) for protocol in results.protocols], dtype=np.int64
+        )
+        protocol_codes = protocol_map[np.frombuffer(results.protocol_codes, dtype=np.uint8)]
+        
+        # Integer sort keys: hosts by IP value (IPv4, IPv6, then names), services by name
+        host_ranks = rank_codes(results.hosts, key=lambda code: (
+            results.host_versions[code] == 0, results.host_versions[code],
+            results.host_numbers[code], results.hosts[code]
+        ))
+        service_ranks = rank_codes(results.services)
+        self.services_by_rank = np.empty(len(results.services), dtype=object)
+        self.services_by_rank[service_ranks] = results.services
+        
+        host_keys = host_ranks[host_codes]
+        service_keys = service_ranks[service_codes]
+        order = np.lexsort((service_keys, ports, protocol_codes, host_keys))
+        host_keys = host_keys[order]
+        protocol_codes = protocol_codes[order]
+        ports = ports[order]
+        service_keys = service_keys[order]
+        host_codes = host_codes[order]
+        
+        # Drop repeated host/protocol/port/service rows (e.g. overlapping scans)
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (
+            (host_keys[1:] != host_keys[:-1]) | (protocol_codes[1:] != protocol_codes[:-1])
+            | (ports[1:] != ports[:-1]) | (service_keys[1:] != service_keys[:-1])
+        )
+        self.host_codes = host_codes[keep]
+        self.port_keys = protocol_codes[keep] * 65536 + ports[keep]
+        self.service_keys = service_keys[keep]
+        self.host_starts = np.flatnonzero(np.r_[True, self.host_codes[1:] != self.host_codes[:-1]])
+        
+        # Show resolved hostnames next to the address where the scan reported one
+        hosts = np.asarray(results.hosts, dtype=object)
+        hostnames = np.asarray(results.hostnames, dtype=object)
+        self.host_labels = np.where(hostnames == '', hosts, hosts + ' (' + hostnames + ')') if len(hosts) else hosts
+    
+    def __len__(self):
+        return len(self.host_codes)
+    
+    def invert(self, group_keys):
+        """Order the rows by `group_keys`, keeping one row per group and host; return (rows, group starts)."""
+        import numpy as np
+        
+        # Rows are already in host order, so a stable sort keeps each group's hosts sorted
+        rows = np.argsort(group_keys, kind='stable')
+        keys = group_keys[rows]
+        host_codes = self.host_codes[rows]
+        keep = np.r_[True, (keys[1:] != keys[:-1]) | (host_codes[1:] != host_codes[:-1])]
+        rows = rows[keep]
+        keys = keys[keep]
+        return rows, np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    
+    def port_labels(self, port_keys):
+        """Format packed protocol/port keys as "TCP/443"."""
+        import numpy as np
+        
+        protocols, ports = np.divmod(port_keys, 65536)
+        return np.asarray(self.protocol_labels, dtype=object)[protocols] + '/' + ports.astype(str).astype(object)
+    
+    def host_report(self, max_cell_chars=EXCEL_MAX_CELL_CHARS):
+        """One row per host with its protocol/port/service lines."""
+        import numpy as np
+        
+        if not len(self):
+            return {HOST_COLUMN: [], PORTS_COLUMN: [], COMMENTS_COLUMN: []}
+        
+        # Format each distinct protocol/port/service combination once
+        service_count = max(len(self.services_by_rank), 1)
+        unique_keys, line_codes = np.unique(self.port_keys * service_count + self.service_keys, return_inverse=True)
+        unique_ports, unique_services = np.divmod(unique_keys, service_count)
+        unique_lines = self.port_labels(unique_ports) + '/' + self.services_by_rank[unique_services] + '/OPEN'
+        
+        table = {
+            HOST_COLUMN: self.host_labels[self.host_codes[self.host_starts]].tolist(),
+            PORTS_COLUMN: join_runs(unique_lines, line_codes, self.host_starts),
+            COMMENTS_COLUMN: [REPORT_COMMENT] * len(self.host_starts)
+        }
+        # Hosts answering on thousands of ports overflow a single cell
+        return split_table_cells(table, PORTS_COLUMN, HOST_COLUMN, max_cell_chars)
+    
+    def port_report(self, max_cell_chars=EXCEL_MAX_CELL_CHARS):
+        """One row per protocol/port: the services seen on it and the hosts exposing it."""
+        import numpy as np
+        
+        if not len(self):
+            return {PORT_COLUMN: [], SERVICES_COLUMN: [], HOST_COUNT_COLUMN: [], HOSTS_COLUMN: []}
+        
+        rows, starts = self.invert(self.port_keys)
+        
+        # Distinct services per port, in name order
+        service_count = max(len(self.services_by_rank), 1)
+        pairs = distinct_sorted(self.port_keys * service_count + self.service_keys)
+        pair_ports, pair_services = np.divmod(pairs, service_count)
+        pair_starts = np.flatnonzero(np.r_[True, pair_ports[1:] != pair_ports[:-1]])
+        
+        table = {
+            PORT_COLUMN: self.port_labels(self.port_keys[rows[starts]]).tolist(),
+            SERVICES_COLUMN: join_runs(self.services_by_rank, pair_services, pair_starts, '; '),
+            HOST_COUNT_COLUMN: np.diff(np.r_[starts, len(rows)]).tolist(),
+            HOSTS_COLUMN: join_runs(self.host_labels, self.host_codes[rows], starts)
+        }
+        return split_table_cells(table, HOSTS_COLUMN, PORT_COLUMN, max_cell_chars)
+    
+    def service_report(self, max_cell_chars=EXCEL_MAX_CELL_CHARS):
+        """One row per service: how many hosts and protocol/ports expose it, and which hosts."""
+        import numpy as np
+        
+        if not len(self):
+            return {SERVICE_COLUMN: [], HOST_COUNT_COLUMN: [], PORT_COUNT_COLUMN: [], HOSTS_COLUMN: []}
+        
+        rows, starts = self.invert(self.service_keys)
+        
+        # Distinct protocol/ports per service
+        port_key_count = len(self.protocol_labels) * 65536
+        pairs = distinct_sorted(self.service_keys * port_key_count + self.port_keys)
+        pair_services = pairs // port_key_count
+        port_counts = np.diff(np.r_[np.flatnonzero(np.r_[True, pair_services[1:] != pair_services[:-1]]), len(pairs)])
+        
+        table = {
+            SERVICE_COLUMN: self.services_by_rank[self.service_keys[rows[starts]]].tolist(),
+            HOST_COUNT_COLUMN: np.diff(np.r_[starts, len(rows)]).tolist(),
+            PORT_COUNT_COLUMN: port_counts.tolist(),
+            HOSTS_COLUMN: join_runs(self.host_labels, self.host_codes[rows], starts)
+        }
+        return split_table_cells(table, HOSTS_COLUMN, SERVICE_COLUMN, max_cell_chars)
+    
+    def host_summary(self):
+        """One row per host with the number of distinct protocol/ports it has open."""
+        import numpy as np
+        
+        if not len(self):
+            return {HOST_COLUMN: [], PORT_COUNT_COLUMN: []}
+        
+        # Rows are in host, protocol/port order; a port reported with two services counts once
+        host_codes = self.host_codes
+        distinct = np.r_[True, (host_codes[1:] != host_codes[:-1]) | (self.port_keys[1:] != self.port_keys[:-1])]
+        port_counts = np.add.reduceat(distinct.astype(np.int64), self.host_starts)
+        return {
+            HOST_COLUMN: self.host_labels[host_codes[self.host_starts]].tolist(),
+            PORT_COUNT_COLUMN: port_counts.tolist()
+        }
+
+def build_host_report(results, max_cell_chars=EXCEL_MAX_CELL_CHARS):
+    """Aggregate open-port rows into one report row per host, without per-row Python code.
+    
+    A host whose port list exceeds `max_cell_chars` (Excel's cell limit)
+    continues on extra rows labelled "(part i/n)".
+    
+    Returns a report table: a dict of column header -> list of values.
+    """
+    return OpenPortIndex(results).host_report(max_cell_chars)
+
+def build_report_sheets(results, max_cell_chars=EXCEL_MAX_CELL_CHARS):
+    """Return the (title, table) sheets of the host report and its "By Port", "By Service" and "By Host" summaries.
+    
+    The rows are sorted and deduplicated once for all three sheets.
+    """
+    index = OpenPortIndex(results)
+    return [
+        (REPORT_SHEET_TITLE, index.host_report(max_cell_chars)),
+        (PORT_SHEET_TITLE, index.port_report(max_cell_chars)),
+        (SERVICE_SHEET_TITLE, index.service_report(max_cell_chars)),
+        (HOST_SHEET_TITLE, index.host_summary())
+    ]
+
+# Scan-to-scan comparison sheet
+DIFF_SHEET_TITLE = "Scan Diff"
+DIFF_COLUMNS = ['Change', HOST_COLUMN, 'Protocol/Port', 'Baseline Service', 'Current Service']
+
+def diff_scan_results(baseline, current):
+    """Compare two result sets by (host, protocol, port); return a table of added/removed/changed entries.
     
-    data_font = Font(name="Calibri", size=11)
-    data_alignment = Alignment(vertical="top", wrap_text=True)
+    Rows of both sides are packed into integer (host, protocol, port) keys over
+    shared host/protocol/service tables and compared with sorted set operations,
+    so diffing full-range scans stays fast; Python only touches the differences.
+    """
+    import numpy as np
+    
+    # Shared lookup tables so codes from both sides are comparable
+    hosts, host_index, hostnames = [], {}, {}
+    protocols, protocol_index = [], {}
+    services, service_index = [], {}
+    host_sort_keys = []
+    
+    def encode(results):
+        host_map = []
+        for code, host in enumerate(results.hosts):
+            if host not in host_index:
+                host_index[host] = len(hosts)
+                hosts.append(host)
+                version = results.host_versions[code]
+                host_sort_keys.append((version == 0, version, results.host_numbers[code], host))
+            if results.hostnames[code]:
+                hostnames[host] = results.hostnames[code]
+            host_map.append(host_index[host])
+        protocol_map = []
+        for protocol in results.protocols:
+            protocol_map.append(protocol_index.setdefault(protocol.lower(), len(protocol_index)))
+            if len(protocols) < len(protocol_index):
+                protocols.append(protocol.lower())
+        service_map = []
+        for service in results.services:
+            service_map.append(service_index.setdefault(service, len(service_index)))
+            if len(services) < len(service_index):
+                services.append(service)
+        
+        host_codes = np.asarray(host_map, dtype=np.int64)[np.frombuffer(results.host_codes, dtype=np.uint32)]
+        protocol_codes = np.asarray(protocol_map, dtype=np.int64)[np.frombuffer(results.protocol_codes, dtype=np.uint8)]
+        service_codes = np.asarray(service_map, dtype=np.int64)[np.frombuffer(results.service_codes, dtype=np.uint32)]
+        ports = np.frombuffer(results.ports, dtype=np.uint16).astype(np.int64)
+        return (host_codes * 256 + protocol_codes) * 65536 + ports, service_codes
+    
+    baseline_keys, baseline_services = encode(baseline)
+    current_keys, current_services = encode(current)
+    
+    # (key, service) pairs describe each side; a key is changed if its pairs differ
+    service_count = max(len(services), 1)
+    baseline_pairs = np.unique(baseline_keys * service_count + baseline_services)
+    current_pairs = np.unique(current_keys * service_count + current_services)
+    baseline_keys = np.unique(baseline_keys)
+    current_keys = np.unique(current_keys)
+    
+    added = np.setdiff1d(current_keys, baseline_keys, assume_unique=True)
+    removed = np.setdiff1d(baseline_keys, current_keys, assume_unique=True)
+    differing = np.unique(np.setxor1d(baseline_pairs, current_pairs, assume_unique=True) // service_count)
+    changed = np.intersect1d(differing, np.intersect1d(baseline_keys, current_keys, assume_unique=True),
+                             assume_unique=True)
+    
+    # Collect service names for the differing keys only
+    def services_by_key(pairs, keys):
+        selected = pairs[np.isin(pairs // service_count, keys)]
+        by_key = {}
+        for key, service in zip((selected // service_count).tolist(), (selected % service_count).tolist()):
+            by_key.setdefault(key, []).append(services[service])
+        return by_key
+    
+    reported = np.concatenate([added, removed, changed])
+    labels = np.array(['ADDED'] * len(added) + ['REMOVED'] * len(removed) + ['CHANGED'] * len(changed),
+                      dtype=object)
+    before = services_by_key(baseline_pairs, reported)
+    after = services_by_key(current_pairs, reported)
+    
+    # Order by host address value, then protocol and port, like the main report
+    host_ranks = rank_codes(hosts, key=host_sort_keys.__getitem__)
+    host_codes, remainder = np.divmod(reported, 256 * 65536)
+    protocol_codes, ports = np.divmod(remainder, 65536)
+    order = np.lexsort((ports, protocol_codes, host_ranks[host_codes]))
+    
+    rows = []
+    for index in order.tolist():
+        key = int(reported[index])
+        host = hosts[host_codes[index]]
+        rows.append((
+            labels[index],
+            f"{host} ({hostnames[host]})" if host in hostnames else host,
+            f"{protocols[protocol_codes[index]].upper()}/{ports[index]}",
+            '; '.join(sorted(before.get(key, []))),
+            '; '.join(sorted(after.get(key, [])))
+        ))
+    return {column: [row[index] for row in rows] for index, column in enumerate(DIFF_COLUMNS)}
+
+# Report sheet layout
+REPORT_SHEET_TITLE = "Nmap Port Scan Results"
+PORT_SHEET_TITLE = "By Port"
+SERVICE_SHEET_TITLE = "By Service"
+HOST_SHEET_TITLE = "By Host"
+REPORT_TAB_COLOR = "4472C4"
+REPORT_ROW_HEIGHT = 20
+MAX_COLUMN_WIDTH = 50
+
+def create_report_styles(workbook):
+    """Register the shared named styles used by every report cell."""
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
     
     border = Border(
         left=Side(style="thin"),
@@ -309,51 +1302,889 @@ def style_excel_worksheet(worksheet):
         bottom=Side(style="thin")
     )
     
-    # Style header row
-    for cell in worksheet[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Style data rows
-    for row in worksheet.iter_rows(min_row=2):
-        for cell in row:
-            cell.font = data_font
-            cell.alignment = data_alignment
-            cell.border = border
-    
-    # Auto-adjust column widths
-    for col in worksheet.columns:
-        max_length = 0
-        column = col[0].column_letter
-        
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
+    header_style = NamedStyle(name="Report Header")
+    header_style.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_style.font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
+    header_style.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    header_style.border = border
+    
+    data_style = NamedStyle(name="Report Data")
+    data_style.font = Font(name="Calibri", size=11)
+    data_style.alignment = Alignment(vertical="top", wrap_text=True)
+    data_style.border = border
+    
+    workbook.add_named_style(header_style)
+    workbook.add_named_style(data_style)
+
+def column_width(header, values):
+    """Width fitting the longest value of a column (header included), capped for readability."""
+    max_length = max(len(str(header)), max(map(len, map(str, values)), default=0))
+    return min((max_length + 2) * 1.2, MAX_COLUMN_WIDTH)
+
+def write_report_sheet(workbook, title, table):
+    """Stream a report table (column header -> values) into a new styled write-only worksheet."""
+    from openpyxl.cell import Cell, WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    
+    worksheet = workbook.create_sheet(title)
+    worksheet.sheet_properties.tabColor = REPORT_TAB_COLOR
+    worksheet.sheet_format.defaultRowHeight = REPORT_ROW_HEIGHT
+    worksheet.sheet_format.customHeight = True
+    
+    headers = list(table)
+    columns = list(table.values())
+    
+    # Column widths must precede the row data in the sheet XML
+    for index, (header, values) in enumerate(zip(headers, columns), start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = column_width(header, values)
+    
+    # Resolve each named style once; every cell then shares its style record
+    def style_record(style):
+        prototype = WriteOnlyCell(worksheet)
+        prototype.style = style
+        return prototype._style
+    
+    def styled_row(values, style):
+        return [Cell(worksheet, row=1, column=1, value=value, style_array=style) for value in values]
+    
+    worksheet.append(styled_row(headers, style_record("Report Header")))
+    data_style = style_record("Report Data")
+    for values in zip(*columns):
+        worksheet.append(styled_row(values, data_style))
+
+def write_excel_report(output_file, sheets, max_sheet_rows=EXCEL_MAX_ROWS):
+    """Write (title, table) sheets to a styled workbook in a single streaming pass.
+    
+    A table with more rows than fit in a sheet continues on further sheets
+    titled "<title> (2)", "<title> (3)", ...
+    """
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    create_report_styles(workbook)
+    
+    shard_rows = max_sheet_rows - 1  # below the header row
+    for title, table in sheets:
+        rows = table_length(table)
+        if rows <= shard_rows:
+            write_report_sheet(workbook, title, table)
+            continue
+        for number, start in enumerate(range(0, rows, shard_rows), start=1):
+            shard = {column: values[start:start + shard_rows] for column, values in table.items()}
+            write_report_sheet(workbook, title if number == 1 else f"{title} ({number})", shard)
+    
+    workbook.save(output_file)
+
+# Columns of the flat, one row per open port outputs (CSV, JSONL, Parquet)
+CSV_COLUMNS = ['Host', 'Hostname', 'Protocol', 'Port', 'Service', 'State']
+FLAT_OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+OUTPUT_CHUNK_ROWS = 100000
+
+def iter_result_chunks(results, chunk_rows=OUTPUT_CHUNK_ROWS):
+    """Yield the rows of a ScanResults as tables of CSV_COLUMNS, `chunk_rows` rows at a time."""
+    # An empty store still yields one (empty) chunk so the file gets its header
+    for start in range(0, max(len(results), 1), chunk_rows):
+        host_codes = results.host_codes[start:start + chunk_rows]
+        yield {
+            'Host': [results.hosts[code] for code in host_codes],
+            'Hostname': [results.hostnames[code] for code in host_codes],
+            'Protocol': [results.protocols[code] for code in results.protocol_codes[start:start + chunk_rows]],
+            'Port': results.ports[start:start + chunk_rows].tolist(),
+            'Service': [results.services[code] for code in results.service_codes[start:start + chunk_rows]],
+            'State': ['open'] * len(host_codes)
+        }
+
+def write_table_chunks(output_file, chunks, output_format, append=False):
+    """Stream tables that share their columns to a CSV, JSONL or Parquet file, one chunk at a time.
+    
+    With `append`, CSV and JSONL rows are added to an existing file (a CSV
+    header is only written to an empty one). Parquet needs the optional
+    pyarrow package and writes one row group per chunk.
+    """
+    if output_format == 'parquet':
+        if append:
+            raise ValueError("Parquet files cannot be appended to")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs the pyarrow package (pip install pyarrow)")
         
-        adjusted_width = (max_length + 2) * 1.2
-        worksheet.column_dimensions[column].width = min(adjusted_width, 50)
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pydict(chunk)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_file, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+    
+    write_header = not append or not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    with open(output_file, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+        if output_format == 'jsonl':
+            for chunk in chunks:
+                # Encode each distinct value once; rows are then plain string joins
+                encoded = []
+                for column, values in chunk.items():
+                    prefix = json.dumps(column) + ': '
+                    cache = {}
+                    encoded.append([
+                        cache[value] if value in cache else cache.setdefault(value, prefix + json.dumps(value))
+                        for value in values
+                    ])
+                f.writelines('{' + ', '.join(row) + '}\n' for row in zip(*encoded))
+            return
+        
+        writer = csv.writer(f)
+        for chunk in chunks:
+            if write_header:
+                writer.writerow(list(chunk))
+                write_header = False
+            writer.writerows(zip(*chunk.values()))
+
+def write_flat_results(output_file, results, output_format='csv', append=False):
+    """Stream open-port rows to a CSV, JSONL or Parquet file, one row per port (no pandas/openpyxl needed)."""
+    write_table_chunks(output_file, iter_result_chunks(results), output_format, append)
+
+def write_table(output_file, table, output_format='csv'):
+    """Write a report table (column header -> values) to a CSV, JSONL or Parquet file."""
+    write_table_chunks(output_file, [table], output_format)
+
+
+# Order in which -oA outputs of one scan are preferred: XML carries product
+# details, gnmap is the fast fallback when the XML is missing or incomplete
+FORMAT_PREFERENCE = ('.xml', '.gnmap', '.nmap')
+
+# Scan header patterns used to tell whether files share a basename by coincidence
+NMAP_HEADER_PATTERN = re.compile(r'# Nmap \S+ scan initiated (.+?) as: (.+)')
+XML_NMAPRUN_PATTERN = re.compile(r'<nmaprun\s([^>]*)>')
+XML_ATTRIBUTE_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+def read_scan_signature(file_path):
+    """Return the (start time, command line) a result file was written for, or None if unknown."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            head = f.read(8192)
+    except OSError:
+        return None
+    
+    if file_path.endswith('.xml'):
+        nmaprun_match = XML_NMAPRUN_PATTERN.search(head)
+        if not nmaprun_match:
+            return None
+        attributes = dict(XML_ATTRIBUTE_PATTERN.findall(nmaprun_match.group(1)))
+        start = attributes.get('startstr')
+        args = attributes.get('args')
+        if start is None or args is None:
+            return None
+        args = unescape(args, {'&quot;': '"', '&apos;': "'"})
+    else:
+        header_match = NMAP_HEADER_PATTERN.search(head)
+        if not header_match:
+            return None
+        start, args = header_match.groups()
+    
+    return ' '.join(start.split()), ' '.join(args.split())
+
+def is_complete_xml(file_path):
+    """Check whether an XML result was fully written (nmap closes </nmaprun> last)."""
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b'</nmaprun>' in f.read()
+    except OSError:
+        return False
+
+def select_scan_files(nmap_files):
+    """Pick one file per scan where -oA wrote several formats; return (selected, skipped)."""
+    groups = {}
+    for file_path in nmap_files:
+        groups.setdefault(os.path.splitext(file_path)[0], []).append(file_path)
+    
+    skipped = {}
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        
+        by_extension = {os.path.splitext(file_path)[1]: file_path for file_path in group}
+        preferred = None
+        for extension in FORMAT_PREFERENCE:
+            file_path = by_extension.get(extension)
+            if file_path is None:
+                continue
+            if extension == '.xml' and not is_complete_xml(file_path):
+                logger.warning(f"{os.path.basename(file_path)} is incomplete, falling back to another format")
+                continue
+            preferred = file_path
+            break
+        
+        if preferred is None:
+            continue
+        signature = read_scan_signature(preferred)
+        if signature is None:
+            continue
+        
+        # Only skip siblings that provably come from the same nmap run
+        for file_path in group:
+            if file_path != preferred and read_scan_signature(file_path) == signature:
+                skipped[file_path] = preferred
+    
+    selected = [file_path for file_path in nmap_files if file_path not in skipped]
+    return selected, skipped
+
+def parse_nmap_result_file(file_path):
+    """Parse a single Nmap result file with the parser matching its extension."""
+    if file_path.endswith('.gnmap'):
+        return parse_gnmap_file(file_path)
+    elif file_path.endswith('.xml'):
+        return parse_xml_file(file_path)
+    elif file_path.endswith('.nmap'):
+        return parse_nmap_file(file_path)
+    return ScanResults()
+
+def parse_file_with_metrics(file_path, byte_range=None):
+    """Parse a result file, returning (results, {wall_seconds, cpu_seconds, bytes_read}).
     
-    # Set row height for better readability
-    for row_idx in range(1, worksheet.max_row + 1):
-        worksheet.row_dimensions[row_idx].height = 20
+    With `byte_range` (start, stop), only that line-aligned part of a .gnmap file is parsed.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if byte_range is None:
+        results = parse_nmap_result_file(file_path)
+        bytes_read = os.path.getsize(file_path)
+    else:
+        results = parse_gnmap_file(file_path, start=byte_range[0], stop=byte_range[1])
+        bytes_read = byte_range[1] - byte_range[0]
+    return results, {
+        'wall_seconds': round(time.perf_counter() - wall_start, 4),
+        'cpu_seconds': round(time.process_time() - cpu_start, 4),
+        'bytes_read': bytes_read
+    }
 
-def process_nmap_files(input_directory, output_file):
-    """Process all Nmap files in the directory and generate Excel report."""
+# ProcessPoolExecutor refuses more than 61 workers on Windows
+MAX_WINDOWS_WORKERS = 61
+
+def iter_parsed_files(nmap_files, workers=None):
+    """Parse files, in parallel worker processes when useful.
+    
+    Large .gnmap files are split into line-aligned byte ranges so several
+    workers share one file; the ranges are merged back in order.
+    Yields (file_path, results, file_metrics) in input order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if os.name == 'nt':
+        workers = min(workers, MAX_WINDOWS_WORKERS)
+    
+    tasks = []
+    for file_path in nmap_files:
+        ranges = [None]
+        if workers > 1 and file_path.endswith('.gnmap'):
+            ranges = gnmap_line_ranges(file_path, workers)
+            if len(ranges) == 1:
+                ranges = [None]
+        tasks.extend((file_path, byte_range) for byte_range in ranges)
+    range_counts = Counter(file_path for file_path, _ in tasks)
+    workers = max(1, min(workers, len(tasks)))
+    
+    if workers == 1:
+        parsed = (parse_file_with_metrics(file_path, byte_range) for file_path, byte_range in tasks)
+        executor = None
+    else:
+        logger.info(f"Parsing with {workers} worker processes")
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # map() hands results back in submission order, keeping output deterministic
+        parsed = executor.map(
+            parse_file_with_metrics, [file_path for file_path, _ in tasks], [byte_range for _, byte_range in tasks]
+        )
+    
     try:
-        logger.info(f"Processing Nmap files from {input_directory}")
+        merged = None
+        parts = 0
+        for (file_path, _), (results, file_metrics) in zip(tasks, parsed):
+            if merged is None:
+                merged, merged_metrics = results, dict(file_metrics)
+            else:
+                # Ranges of one file ran side by side: wall time is the slowest range
+                merged.extend(results)
+                merged_metrics['wall_seconds'] = max(merged_metrics['wall_seconds'], file_metrics['wall_seconds'])
+                merged_metrics['cpu_seconds'] = round(merged_metrics['cpu_seconds'] + file_metrics['cpu_seconds'], 4)
+                merged_metrics['bytes_read'] += file_metrics['bytes_read']
+            parts += 1
+            if parts == range_counts[file_path]:
+                yield file_path, merged, merged_metrics
+                merged = None
+                parts = 0
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+# Parse cache kept next to the results, one entry file per parsed result file
+PARSE_CACHE_DIRNAME = '.segpt_cache'
+# Bump whenever parser output changes so older entries are re-parsed
+PARSE_CACHE_VERSION = 3
+PARSE_CACHE_MAGIC = b'SEGPTPC1'
+
+class ParseCache:
+    """On-disk cache of parsed ScanResults, keyed by file path, size, mtime and content hash.
+    
+    A file whose size and mtime match its entry is loaded without being read.
+    If only the mtime moved (e.g. the file was copied or touched) the content
+    hash decides, so unchanged files are still served from the cache.
+    Entries are kept in `directory`, or by default in a .segpt_cache folder
+    next to each result file.
+    """
+    
+    def __init__(self, directory=None):
+        self.directory = directory
+    
+    def cache_directory(self, file_path):
+        """Return the folder holding a result file's cache entry."""
+        if self.directory is not None:
+            return self.directory
+        return os.path.join(os.path.dirname(os.path.abspath(file_path)), PARSE_CACHE_DIRNAME)
+    
+    def entry_path(self, file_path):
+        """Return the cache entry file for a result file."""
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_directory(file_path), f"{key}.bin")
+    
+    @staticmethod
+    def file_signature(file_path):
+        """Return the (size, mtime in ns) of a file."""
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    @staticmethod
+    def content_hash(file_path):
+        """Return the BLAKE2 digest of a file's contents."""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _read_entry(entry_path, with_payload=True):
+        """Return (metadata, payload) of a cache entry file, or None."""
+        try:
+            with open(entry_path, 'rb') as f:
+                if f.read(len(PARSE_CACHE_MAGIC)) != PARSE_CACHE_MAGIC:
+                    return None
+                (metadata_length,) = struct.unpack('<I', f.read(4))
+                metadata = json.loads(f.read(metadata_length).decode('utf-8'))
+                return metadata, f.read() if with_payload else None
+        except (OSError, ValueError, struct.error):
+            return None
+    
+    def load(self, file_path):
+        """Return the cached ScanResults for a file, or None if missing or stale."""
+        entry = self._read_entry(self.entry_path(file_path))
+        if entry is None:
+            return None
+        metadata, payload = entry
+        
+        # Fallback service names depend on the nmap-services table in use
+        if (metadata.get('version') != PARSE_CACHE_VERSION
+                or metadata.get('path') != os.path.abspath(file_path)
+                or metadata.get('services') != get_service_index().signature):
+            return None
+        
+        size, mtime_ns = self.file_signature(file_path)
+        if size != metadata.get('size'):
+            return None
+        if mtime_ns != metadata.get('mtime_ns'):
+            # Same size but touched: only trust the entry if the content is unchanged
+            if self.content_hash(file_path) != metadata.get('hash'):
+                return None
+            self._write_entry(file_path, (size, mtime_ns), metadata['hash'], payload)
+        
+        try:
+            return ScanResults.from_bytes(payload)
+        except (ValueError, KeyError, struct.error, zlib.error) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {os.path.basename(file_path)}: {e}")
+            return None
+    
+    def store(self, file_path, results, signature):
+        """Cache a file's results; `signature` is its (size, mtime) from before it was parsed."""
+        # A file that changed while it was being parsed must not be cached
+        if self.file_signature(file_path) != signature:
+            return
+        self._write_entry(file_path, signature, self.content_hash(file_path), results.to_bytes())
+    
+    def _write_entry(self, file_path, signature, content_hash, payload):
+        """Atomically write an entry file; a cache that cannot be written is skipped with a warning."""
+        metadata = json.dumps({
+            'version': PARSE_CACHE_VERSION,
+            'path': os.path.abspath(file_path),
+            'size': signature[0],
+            'mtime_ns': signature[1],
+            'hash': content_hash,
+            'services': get_service_index().signature
+        }).encode('utf-8')
+        
+        entry_path = self.entry_path(file_path)
+        temp_path = f"{entry_path}.tmp"
+        try:
+            os.makedirs(self.cache_directory(file_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(PARSE_CACHE_MAGIC)
+                f.write(struct.pack('<I', len(metadata)))
+                f.write(metadata)
+                f.write(payload)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            # e.g. a read-only results share: the conversion itself only needs read access
+            logger.warning(f"Could not write parse cache entry for {os.path.basename(file_path)}: {e}")
+    
+    def _remove_entries(self, file_paths, stale_only):
+        """Remove entries from the cache folders used by `file_paths`; return the count removed."""
+        removed = 0
+        for directory in sorted({self.cache_directory(file_path) for file_path in file_paths}):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                # Other files (e.g. the compiled service index) are not parse entries
+                if not name.endswith(('.bin', '.bin.tmp')):
+                    continue
+                entry_path = os.path.join(directory, name)
+                if stale_only:
+                    entry = self._read_entry(entry_path, with_payload=False)
+                    if entry is not None and os.path.isfile(entry[0].get('path', '')):
+                        continue
+                try:
+                    os.remove(entry_path)
+                except OSError as e:
+                    logger.warning(f"Could not remove parse cache entry {entry_path}: {e}")
+                    continue
+                removed += 1
+        return removed
+    
+    def evict(self, file_paths):
+        """Remove the entries of result files that no longer exist; return the count removed.
+        
+        Only the cache folders used by `file_paths` are swept. Entries of files
+        that still exist are kept, since a later run may select them again.
+        """
+        return self._remove_entries(file_paths, stale_only=True)
+    
+    def clear(self, file_paths):
+        """Remove all entries from the cache folders used by `file_paths`."""
+        return self._remove_entries(file_paths, stale_only=False)
+
+def peak_rss_bytes():
+    """Return this process's peak resident set size in bytes, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class RunMetrics:
+    """Per-stage and per-file instrumentation of a conversion run.
+    
+    Every stage records wall time, CPU time and the process's peak RSS; with
+    `trace_memory` the stage's own peak Python allocation is measured with
+    tracemalloc too. `profile` captures a cProfile of the whole run. The
+    result is written as a machine-readable JSON run report.
+    """
+    
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.profiler = cProfile.Profile() if profile else None
+        self.started = datetime.now()
+        self.stages = []
+        self.files = []
+        self.totals = {}
+    
+    def start(self):
+        """Begin run-wide captures (tracemalloc, cProfile)."""
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+    
+    def stop(self):
+        """End run-wide captures."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    @contextmanager
+    def stage(self, name, **details):
+        """Time the enclosed block as one named stage."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield details
+        finally:
+            record = {
+                'stage': name,
+                'wall_seconds': round(time.perf_counter() - wall_start, 4),
+                'cpu_seconds': round(time.process_time() - cpu_start, 4),
+                'peak_rss_bytes': peak_rss_bytes()
+            }
+            if self.trace_memory and tracemalloc.is_tracing():
+                record['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+            record.update(details)
+            self.stages.append(record)
+            logger.debug(f"Stage {name} took {record['wall_seconds']:.2f}s")
+    
+    def record_file(self, file_path, rows, file_metrics=None, cached=False, scan='current'):
+        """Record one input file's row count and, if it was parsed, its parse timings."""
+        record = {
+            'file': file_path,
+            'scan': scan,
+            'rows': rows,
+            'cached': cached
+        }
+        if file_metrics is not None:
+            record.update(file_metrics)
+            record['mb_per_second'] = round(
+                file_metrics['bytes_read'] / 1e6 / max(file_metrics['wall_seconds'], 1e-9), 2
+            )
+        self.files.append(record)
+    
+    def report(self):
+        """Return the run report as a dict."""
+        finished = datetime.now()
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': finished.isoformat(timespec='seconds'),
+            'wall_seconds': round((finished - self.started).total_seconds(), 4),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'totals': self.totals,
+            'stages': self.stages,
+            'files': self.files
+        }
+    
+    def write(self, metrics_file):
+        """Write the JSON run report, plus the cProfile stats next to it when profiling."""
+        report = self.report()
+        if self.profiler is not None:
+            profile_file = os.path.splitext(metrics_file)[0] + '.prof'
+            self.profiler.dump_stats(profile_file)
+            report['profile_file'] = profile_file
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Run report saved to {metrics_file}")
+
+# Local SQLite store of parsed results across engagements
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    engagement TEXT NOT NULL,
+    scanned_at TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    open_ports INTEGER NOT NULL,
+    UNIQUE (engagement, scanned_at)
+);
+CREATE TABLE IF NOT EXISTS ports (
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    host TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    service_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ports_port ON ports (port, protocol);
+CREATE INDEX IF NOT EXISTS ports_service ON ports (service_name);
+CREATE INDEX IF NOT EXISTS ports_host ON ports (host);
+CREATE INDEX IF NOT EXISTS ports_scan ON ports (scan_id);
+"""
+STORE_BATCH_SIZE = 50000
+STORE_COLUMNS = ['Engagement', 'Scanned'] + CSV_COLUMNS
+
+def scan_start_time(nmap_files):
+    """Return the earliest start time recorded in the files' scan headers (ISO format), or None."""
+    started = []
+    for file_path in nmap_files:
+        signature = read_scan_signature(file_path)
+        if signature is None:
+            continue
+        try:
+            started.append(datetime.strptime(signature[0], '%a %b %d %H:%M:%S %Y'))
+        except ValueError:
+            continue
+    return min(started).isoformat() if started else None
+
+class ResultsStore:
+    """SQLite database of open ports from many scans, tagged by engagement and scan time.
+    
+    Rows are bulk-loaded in batches inside one transaction, and the ports table
+    is indexed on port, service name and host so lookups across millions of
+    stored ports only touch the matching rows. Importing a scan again (same
+    engagement and start time) replaces its rows.
+    """
+    
+    def __init__(self, db_path):
+        import sqlite3
+        
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('PRAGMA foreign_keys=ON')
+        self.connection.executescript(STORE_SCHEMA)
+    
+    def close(self):
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def import_results(self, results, engagement, scanned_at=None, source=''):
+        """Store a ScanResults as one scan; return its scan id."""
+        imported_at = datetime.now().isoformat(timespec='seconds')
+        if scanned_at is None:
+            scanned_at = imported_at
         
-        all_results = []
+        # Resolve each interned service once rather than per row
+        service_names = [service.split(' (', 1)[0] for service in results.services]
+        rows = (
+            (results.hosts[host_code], results.hostnames[host_code], results.protocols[protocol_code], port,
+             results.services[service_code], service_names[service_code])
+            for host_code, port, protocol_code, service_code in zip(
+                results.host_codes, results.ports, results.protocol_codes, results.service_codes
+            )
+        )
+        
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM scans WHERE engagement = ? AND scanned_at = ?', (engagement, scanned_at)
+            )
+            scan_id = self.connection.execute(
+                'INSERT INTO scans (engagement, scanned_at, imported_at, source, open_ports) VALUES (?, ?, ?, ?, ?)',
+                (engagement, scanned_at, imported_at, source, len(results))
+            ).lastrowid
+            while True:
+                batch = [(scan_id,) + row for row in itertools.islice(rows, STORE_BATCH_SIZE)]
+                if not batch:
+                    break
+                self.connection.executemany(
+                    'INSERT INTO ports (scan_id, host, hostname, protocol, port, service, service_name) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', batch
+                )
+        return scan_id
+    
+    def query(self, ports=None, protocol=None, service=None, host=None, engagement=None, latest=False):
+        """Return the stored rows matching all given filters as STORE_COLUMNS tuples.
+        
+        `ports` is a list of port numbers, `service` matches the service name
+        without product details (case-insensitive), and `host` may be a glob
+        pattern such as 10.1.*. With `latest`, only the newest scan of each
+        engagement is searched.
+        """
+        conditions = []
+        parameters = []
+        if ports:
+            conditions.append(f"p.port IN ({', '.join('?' * len(ports))})")
+            parameters.extend(ports)
+        if protocol:
+            conditions.append('p.protocol = ?')
+            parameters.append(protocol.lower())
+        if service:
+            conditions.append('p.service_name = ?')
+            parameters.append(service.upper())
+        if host:
+            conditions.append('p.host GLOB ?' if glob.has_magic(host) else 'p.host = ?')
+            parameters.append(host)
+        if engagement:
+            conditions.append('s.engagement = ?')
+            parameters.append(engagement)
+        if latest:
+            conditions.append(
+                's.scanned_at = (SELECT MAX(scanned_at) FROM scans AS newer WHERE newer.engagement = s.engagement)'
+            )
+        
+        sql = (
+            "SELECT s.engagement, s.scanned_at, p.host, p.hostname, p.protocol, p.port, p.service, 'open' "
+            'FROM ports AS p JOIN scans AS s ON s.id = p.scan_id'
+        )
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY s.engagement, s.scanned_at, p.host, p.protocol, p.port'
+        return self.connection.execute(sql, parameters).fetchall()
+    
+    @staticmethod
+    def rows_to_results(rows):
+        """Collect queried rows into a ScanResults for the host report."""
+        results = ScanResults()
+        for _, _, host, hostname, protocol, port, service, _ in rows:
+            results.append(host, port, protocol, service, hostname)
+        return results
+
+def query_results_store(store_file, output_file=None, output_format='xlsx', **filters):
+    """Query a ResultsStore (see ResultsStore.query for `filters`) and report the matches.
+    
+    The rows are written to `output_file` as the usual host report (xlsx) or a
+    flat CSV/JSONL/Parquet file with engagement and scan time columns, or
+    printed when no output file is given. Returns the number of matching rows.
+    """
+    started = time.perf_counter()
+    with ResultsStore(store_file) as store:
+        rows = store.query(**filters)
+    logger.info(f"Query matched {len(rows)} open ports in {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    if output_file is None:
+        print('\t'.join(STORE_COLUMNS))
+        for row in rows:
+            print('\t'.join(map(str, row)))
+    elif output_format in FLAT_OUTPUT_FORMATS:
+        write_table(
+            output_file, {column: [row[index] for row in rows] for index, column in enumerate(STORE_COLUMNS)},
+            output_format
+        )
+    elif rows:
+        write_excel_report(output_file, build_report_sheets(ResultsStore.rows_to_results(rows)))
+    else:
+        logger.warning(f"No matching open ports, {output_file} was not written")
+    if output_file is not None and rows:
+        logger.info(f"Query results saved to {output_file}")
+    return len(rows)
+
+def find_nmap_files(input_directory):
+    """List the Nmap result files (.gnmap, .nmap, .xml) in a directory, sorted by name."""
+    nmap_files = []
+    for file in sorted(os.listdir(input_directory)):
+        if file.endswith(('.gnmap', '.nmap', '.xml')):
+            nmap_files.append(os.path.join(input_directory, file))
+    return nmap_files
+
+def resolve_input_files(inputs, warn=True):
+    """Expand input directories, files and glob patterns into a list of Nmap result files.
+    
+    Directories contribute their .gnmap/.nmap/.xml files; files and glob
+    matches are taken as given. Duplicates are dropped, order is kept.
+    `warn=False` silences inputs that match nothing (yet).
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    
+    nmap_files = []
+    for pattern in inputs:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches and warn:
+            logger.warning(f"No files match {pattern}")
+        for path in matches:
+            if os.path.isdir(path):
+                nmap_files.extend(find_nmap_files(path))
+            elif os.path.isfile(path):
+                nmap_files.append(path)
+            elif warn:
+                logger.warning(f"Input not found: {path}")
+    return list(dict.fromkeys(nmap_files))
+
+def table_length(table):
+    """Return the number of rows in a report table."""
+    return len(next(iter(table.values()), []))
+
+def load_scan_results(nmap_files, cache=None, workers=None, dedupe_scans=True, metrics=None, scan='current'):
+    """Parse result files (or load them from `cache`, a ParseCache) into one ScanResults.
+    
+    `scan` labels this result set's stages in the run report.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+    all_results = ScanResults()
+    
+    # Parse each -oA scan only once
+    if dedupe_scans:
+        with metrics.stage('select_scan_files', scan=scan, files=len(nmap_files)):
+            nmap_files, skipped = select_scan_files(nmap_files)
+        for file_path, preferred in skipped.items():
+            logger.info(
+                f"Skipping {os.path.basename(file_path)} "
+                f"(same scan as {os.path.basename(preferred)})"
+            )
+    
+    # Load unchanged files from the parse cache
+    cached = {}
+    signatures = {}
+    if cache is not None:
+        with metrics.stage('cache_load', scan=scan) as details:
+            for file_path in nmap_files:
+                results = cache.load(file_path)
+                if results is None:
+                    signatures[file_path] = cache.file_signature(file_path)
+                else:
+                    cached[file_path] = results
+            details['hits'] = len(cached)
+        if cached:
+            logger.info(f"Loaded {len(cached)} of {len(nmap_files)} files from the parse cache")
+    
+    # Process each file
+    to_parse = [f for f in nmap_files if f not in cached]
+    with metrics.stage('parse', scan=scan, files=len(to_parse)) as details:
+        parsed = iter_parsed_files(to_parse, workers)
+        for file_path in nmap_files:
+            logger.info(f"Processing {os.path.basename(file_path)}")
+            if file_path in cached:
+                results = cached[file_path]
+                metrics.record_file(file_path, len(results), cached=True, scan=scan)
+            else:
+                _, results, file_metrics = next(parsed)
+                metrics.record_file(file_path, len(results), file_metrics, scan=scan)
+                if cache is not None:
+                    cache.store(file_path, results, signatures[file_path])
+            all_results.extend(results)
+            logger.info(f"Found {len(results)} open ports in {os.path.basename(file_path)}")
+        parsed.close()
+        details['rows'] = len(all_results)
+    
+    # Drop entries of files that were removed or are no longer parsed
+    if cache is not None:
+        evicted = cache.evict(nmap_files)
+        if evicted:
+            logger.info(f"Evicted {evicted} stale parse cache entries")
+    
+    return all_results
+
+def process_nmap_files(inputs, output_file, workers=None, dedupe_scans=True,
+                       use_cache=True, clear_cache=False, baseline=None,
+                       metrics_file=None, profile=False, output_format='xlsx',
+                       store_file=None, engagement=None, pivot_sheets=True):
+    """Process the Nmap files in `inputs` (directories, files or glob patterns) and write the report.
+    
+    Files are parsed by up to `workers` processes (default: one per CPU core);
+    pass workers=1 to parse serially in this process. With `dedupe_scans`, only
+    one of the .xml/.gnmap/.nmap files written by the same -oA scan is parsed.
+    Parsed files are cached in a .segpt_cache folder next to them and only new
+    or modified files are parsed again; `use_cache=False` bypasses the cache and
+    `clear_cache=True` empties it first. When `baseline` names the results of a
+    previous scan, a sheet of added/removed/changed ports is added (with flat
+    outputs it is written next to the report as <name>_diff.<format>).
+    With `metrics_file`, per-stage and per-file timings are written there as a
+    JSON run report; `profile` adds tracemalloc peaks and a cProfile capture.
+    `output_format` is 'xlsx' (styled per-host report, plus "By Port",
+    "By Service" and "By Host" summary sheets unless `pivot_sheets` is False,
+    split over extra rows and sheets where Excel's limits require) or 'csv', 'jsonl' or 'parquet'
+    (one row per open port, streamed in chunks without pandas or openpyxl). With `store_file`,
+    the parsed rows are also added to that SQLite ResultsStore under
+    `engagement` (default: the name of the folder holding the first file).
+    """
+    metrics = RunMetrics(trace_memory=profile, profile=profile)
+    metrics.start()
+    try:
+        logger.info(f"Processing Nmap files from {inputs}")
         
         # Find all Nmap files
-        nmap_files = []
-        for file in os.listdir(input_directory):
-            if file.endswith(('.gnmap', '.nmap', '.xml')):
-                nmap_files.append(os.path.join(input_directory, file))
+        with metrics.stage('find_nmap_files'):
+            nmap_files = resolve_input_files(inputs)
         
         if not nmap_files:
             logger.error("No Nmap files found in directory")
@@ -366,21 +2197,12 @@ def process_nmap_files(input_directory, output_file):
         
         logger.info(f"Found {len(nmap_files)} Nmap files")
         
-        # Process each file
-        for file_path in nmap_files:
-            logger.info(f"Processing {os.path.basename(file_path)}")
-            
-            if file_path.endswith('.gnmap'):
-                results = parse_gnmap_file(file_path)
-            elif file_path.endswith('.xml'):
-                results = parse_xml_file(file_path)
-            elif file_path.endswith('.nmap'):
-                results = parse_nmap_file(file_path)
-            else:
-                continue
-                
-            all_results.extend(results)
-            logger.info(f"Found {len(results)} open ports in {os.path.basename(file_path)}")
+        cache = ParseCache() if use_cache else None
+        if cache is not None and clear_cache:
+            logger.info(f"Cleared {cache.clear(nmap_files)} parse cache entries")
+        
+        all_results = load_scan_results(nmap_files, cache, workers, dedupe_scans, metrics)
+        metrics.totals['open_ports'] = len(all_results)
         
         if not all_results:
             logger.warning("No open ports found in any files")
@@ -391,58 +2213,62 @@ def process_nmap_files(input_directory, output_file):
             )
             return False
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_results)
-        logger.info(f"Total open ports found: {len(df)}")
+        logger.info(f"Total open ports found: {len(all_results)}")
         
-        # Create formatted port info using actual service names
-        df['Formatted Port Info'] = df.apply(
-            lambda row: f"{row['Protocol'].upper()}/{int(row['Port'])}/{row['Service']}/OPEN",
-            axis=1
-        )
+        # Keep the parsed rows for later queries across engagements
+        if store_file is not None:
+            if engagement is None:
+                engagement = os.path.basename(os.path.dirname(os.path.abspath(nmap_files[0])))
+            with metrics.stage('store_results', rows=len(all_results)):
+                with ResultsStore(store_file) as store:
+                    store.import_results(all_results, engagement, scan_start_time(nmap_files), str(inputs))
+            logger.info(f"Stored {len(all_results)} open ports in {store_file} as engagement '{engagement}'")
         
-        # Group by host
-        merged_df = df.groupby('Host')['Formatted Port Info'].apply(
-            lambda x: '\n'.join(sorted(x.unique()))
-        ).reset_index()
-        
-        # Rename columns
-        merged_df.rename(columns={
-            'Host': 'Address of Host (Hostname)',
-            'Formatted Port Info': 'Protocol/Port/Service/Status'
-        }, inplace=True)
-        
-        # Add comments
-        merged_df['Comments'] = (
-            "All ports on the target host which are not listed here were observed to be in state "
-            "as FILTERED. Port range scanned: 1-65534."
-        )
+        if output_format in FLAT_OUTPUT_FORMATS:
+            with metrics.stage('write_flat_results', rows=len(all_results), format=output_format):
+                write_flat_results(output_file, all_results, output_format)
+        else:
+            # Build one row per host with its sorted port list, plus the port, service and host summaries
+            with metrics.stage('build_report_sheets', rows=len(all_results)):
+                if pivot_sheets:
+                    sheets = build_report_sheets(all_results)
+                else:
+                    sheets = [(REPORT_SHEET_TITLE, build_host_report(all_results))]
+        hosts_count = len(set(all_results.host_codes))
+        metrics.totals['hosts'] = hosts_count
         
-        # Sort by host
-        merged_df.sort_values(by='Address of Host (Hostname)', inplace=True)
+        # Compare against the previous scan's results
+        if baseline is not None:
+            logger.info(f"Loading baseline Nmap files from {baseline}")
+            baseline_cache = ParseCache() if use_cache else None
+            baseline_results = load_scan_results(
+                resolve_input_files(baseline), baseline_cache, workers, dedupe_scans, metrics, 'baseline'
+            )
+            with metrics.stage('diff_scan_results', rows=len(baseline_results) + len(all_results)):
+                scan_diff = diff_scan_results(baseline_results, all_results)
+            counts = Counter(scan_diff['Change'])
+            logger.info(
+                f"Scan diff: {counts['ADDED']} added, {counts['REMOVED']} removed, "
+                f"{counts['CHANGED']} changed"
+            )
+            if output_format in FLAT_OUTPUT_FORMATS:
+                diff_file = f"{os.path.splitext(output_file)[0]}_diff.{output_format}"
+                write_table(diff_file, scan_diff, output_format)
+                logger.info(f"Scan diff saved to {diff_file}")
+            else:
+                sheets.append((DIFF_SHEET_TITLE, scan_diff))
         
-        # Save to Excel
-        merged_df.to_excel(output_file, index=False, engine='openpyxl')
+        # Save the styled report in one pass
+        if output_format not in FLAT_OUTPUT_FORMATS:
+            with metrics.stage('write_excel_report', rows=sum(table_length(table) for _, table in sheets)):
+                write_excel_report(output_file, sheets)
         logger.info(f"Data saved to {output_file}")
         
-        # Apply styling
-        workbook = openpyxl.load_workbook(output_file)
-        worksheet = workbook.active
-        style_excel_worksheet(worksheet)
-        
-        # Add metadata
-        worksheet.title = "Nmap Port Scan Results"
-        worksheet.sheet_properties.tabColor = "4472C4"
-        
-        workbook.save(output_file)
-        logger.info(f"Excel styling completed")
-        
         # Show success popup
-        hosts_count = len(merged_df)
-        ports_count = len(df)
+        ports_count = len(all_results)
         show_popup_message(
             "Success!", 
-            f"Nmap results processed successfully!\n\n• Found {hosts_count} host(s) with open ports\n• Total open ports: {ports_count}\n• Results saved to: NMap_Port_Scan_Result.xlsx",
+            f"Nmap results processed successfully!\n\n• Found {hosts_count} host(s) with open ports\n• Total open ports: {ports_count}\n• Results saved to: {os.path.basename(output_file)}",
             "info"
         )
         
@@ -456,24 +2282,607 @@ def process_nmap_files(input_directory, output_file):
             "error"
         )
         return False
+    
+    finally:
+        metrics.stop()
+        if metrics_file is not None:
+            try:
+                metrics.write(metrics_file)
+            except OSError as e:
+                logger.error(f"Could not write run report {metrics_file}: {e}")
+
+def replace_report(output_file, results, output_format='xlsx'):
+    """Rewrite a report that is refreshed while a scan runs, atomically; return whether it was written."""
+    temp_file = f"{output_file}.tmp"
+    try:
+        if output_format in FLAT_OUTPUT_FORMATS:
+            write_flat_results(temp_file, results, output_format)
+        else:
+            # Live refreshes keep to the host sheet; the pivot sheets come with the final batch run
+            write_excel_report(temp_file, [(REPORT_SHEET_TITLE, build_host_report(results))])
+        os.replace(temp_file, output_file)
+        return True
+    except OSError as e:
+        # e.g. the report is open in Excel; the next refresh tries again
+        logger.warning(f"Could not update {output_file}: {e}")
+        return False
 
-def main():
+class ScanFileFollower:
+    """Follow a result file that nmap is still writing, parsing only newly completed hosts.
+    
+    Each poll reads from the last offset to the current end of the file. A
+    partially written trailing line (or XML element) is held back until the
+    rest arrives, so every host record is parsed exactly once. If the file
+    shrinks (the scan was restarted) it is followed again from the start.
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[1].lower()
+        self._reset()
+    
+    def _reset(self):
+        """Start over from the beginning of the file."""
+        self.offset = 0
+        self.pending = b''
+        self.finished = False
+        self.results = ScanResults()
+        self.text_parser = NmapTextParser()
+        self.xml_parser = ET.XMLPullParser(events=('start', 'end'))
+        self.xml_root = None
+    
+    def poll(self):
+        """Parse what was appended since the last poll; return the new rows as a ScanResults."""
+        new_rows = ScanResults()
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError:
+            return new_rows
+        if size < self.offset:
+            logger.warning(f"{os.path.basename(self.file_path)} was truncated, reading it again")
+            self._reset()
+        if size == self.offset or self.finished:
+            return new_rows
+        
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+        
+        records = self._feed_xml(data) if self.extension == '.xml' else self._feed_lines(data)
+        return self._add_records(records)
+    
+    def close(self):
+        """Return the rows of a last .nmap host block that no later line has closed yet."""
+        record = self.text_parser.close() if self.extension == '.nmap' else None
+        return self._add_records([record] if record is not None else [])
+    
+    def _add_records(self, records):
+        """Store completed host records, returning their rows with services resolved."""
+        new_rows = ScanResults()
+        for host, hostname, ports in records:
+            if ports:
+                new_rows.append_host(host, ports, hostname)
+        new_rows.resolve_services()
+        self.results.extend(new_rows)
+        return new_rows
+    
+    def _feed_lines(self, data):
+        """Parse the complete lines of .gnmap/.nmap output, keeping a partial last line for later."""
+        lines = (self.pending + data).split(b'\n')
+        self.pending = lines.pop()
+        
+        records = []
+        for raw_line in lines:
+            line = raw_line.rstrip(b'\r').decode('utf-8', errors='ignore')
+            if line.startswith(('# Nmap done', 'Nmap done')):
+                self.finished = True
+            
+            if self.extension == '.gnmap':
+                record = parse_gnmap_line(line)
+            elif self.finished:
+                record = self.text_parser.close()
+            else:
+                record = self.text_parser.feed(line)
+            if record is not None:
+                records.append(record)
+        return records
+    
+    def _feed_xml(self, data):
+        """Feed XML to the pull parser and collect every <host> element it completed."""
+        records = []
+        try:
+            self.xml_parser.feed(data)
+            for event, elem in self.xml_parser.read_events():
+                if event == 'start':
+                    if self.xml_root is None:
+                        self.xml_root = elem
+                    continue
+                
+                if elem is self.xml_root:
+                    self.finished = True
+                elif elem.tag == 'host':
+                    record = xml_host_record(elem)
+                    if record is not None:
+                        records.append(record)
+                    # Drop the finished host (and anything before it) from the tree
+                    self.xml_root.clear()
+        except ET.ParseError as e:
+            logger.error(f"Error parsing XML file {self.file_path}: {e}; no longer following it")
+            self.finished = True
+        return records
+
+def append_feed_rows(feed_file, results):
+    """Append open-port rows to a .jsonl or .csv feed file."""
+    feed_format = 'csv' if feed_file.lower().endswith('.csv') else 'jsonl'
+    write_flat_results(feed_file, results, feed_format, append=True)
+
+def watch_nmap_files(inputs, output_file, interval=30.0, feed_file=None, output_format='xlsx',
+                     dedupe_scans=True, until_complete=False):
+    """Follow Nmap result files while the scan is running and keep the report up to date.
+    
+    Every `interval` seconds, new files matching `inputs` are picked up and each
+    followed file is read from its last offset, so only hosts completed since
+    the previous refresh are parsed. When new open ports were found the report
+    is rewritten (atomically) and their rows are appended to `feed_file`
+    (.jsonl or .csv). With `until_complete`, watching stops once every followed
+    scan has finished; otherwise it runs until interrupted (Ctrl+C).
+    Returns the number of open ports found.
+    """
+    followers = {}
+    known_files = set()
+    all_results = ScanResults()
+    
+    def refresh(final=False):
+        nonlocal all_results, known_files
+        
+        # Pick up result files as nmap creates them, one per -oA scan
+        nmap_files = resolve_input_files(inputs, warn=False)
+        if set(nmap_files) != known_files:
+            known_files = set(nmap_files)
+            selected, skipped = select_scan_files(nmap_files) if dedupe_scans else (nmap_files, {})
+            for file_path in selected:
+                # Keep following the file a scan was first picked up from
+                if file_path in followers or any(skipped.get(followed) == file_path for followed in followers):
+                    continue
+                logger.info(f"Following {os.path.basename(file_path)}")
+                followers[file_path] = ScanFileFollower(file_path)
+        
+        new_rows = ScanResults()
+        for follower in followers.values():
+            new_rows.extend(follower.poll())
+            if final:
+                new_rows.extend(follower.close())
+        if not len(new_rows):
+            return
+        
+        if feed_file is not None:
+            append_feed_rows(feed_file, new_rows)
+        
+        all_results = ScanResults()
+        for follower in followers.values():
+            all_results.extend(follower.results)
+        replace_report(output_file, all_results, output_format)
+        logger.info(f"{len(new_rows)} new open ports, {len(all_results)} in total")
+    
+    logger.info(f"Watching {inputs} every {interval:g}s (Ctrl+C to stop)")
+    try:
+        while True:
+            refresh()
+            if until_complete and followers and all(follower.finished for follower in followers.values()):
+                logger.info("All followed scans have finished")
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    
+    # Report a last .nmap host block that was still open
+    refresh(final=True)
+    return len(all_results)
+
+# Chunked scan orchestration; the scan options of the documented nmap command
+NMAP_SCAN_ARGS = (
+    '-sS', '-Pn', '-p-', '-T4', '--max-rtt-timeout', '100ms', '--max-retries', '3', '--defeat-rst-ratelimit'
+)
+NMAP_MIN_RATE = 450
+NMAP_MAX_RATE = 15000
+SCAN_STATE_FILENAME = 'scan_state.json'
+SCAN_STATE_VERSION = 1
+SCAN_CHUNK_PREFIX = 'open_port_chunk'
+
+def read_scope(scope_file):
+    """Read the targets of an nmap -iL file (whitespace separated, # comments allowed)."""
+    targets = []
+    with open(scope_file, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            targets.extend(line.split('#', 1)[0].split())
+    return targets
+
+def rate_share(rate, processes):
+    """Return one process's share of a global packet rate, formatted for nmap (None if unset)."""
+    if not rate:
+        return None
+    return f"{rate / max(processes, 1):g}"
+
+def load_scan_state(state_file, targets, chunk_size):
+    """Load the resumable state of a chunked scan, or start a new one.
+    
+    Raises ValueError if the state was written for a different scope or chunk size,
+    since its chunk numbers would then cover other targets.
+    """
+    targets_hash = hashlib.sha1('\n'.join(targets).encode('utf-8')).hexdigest()
+    state = {
+        'version': SCAN_STATE_VERSION,
+        'targets_hash': targets_hash,
+        'chunk_size': chunk_size,
+        'chunks': {}
+    }
+    if not os.path.exists(state_file):
+        return state
+    
+    with open(state_file, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    if (saved.get('version') != SCAN_STATE_VERSION or saved.get('targets_hash') != targets_hash
+            or saved.get('chunk_size') != chunk_size):
+        raise ValueError(
+            f"{state_file} belongs to a different scope or chunk size; use another scan folder"
+        )
+    return saved
+
+def save_scan_state(state_file, state):
+    """Atomically write the scan state."""
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_file, state_file)
+
+async def run_nmap_chunk(command, log_file):
+    """Run one nmap process with its console output in `log_file`; return its exit code.
+    
+    The process is killed if the scan is cancelled (e.g. by Ctrl+C).
+    """
+    import asyncio
+    
+    with open(log_file, 'wb') as log:
+        process = await asyncio.create_subprocess_exec(*command, stdout=log, stderr=asyncio.subprocess.STDOUT)
+        try:
+            return await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+def read_log_tail(log_file, length=2000):
+    """Return the end of a text log, or '' if it cannot be read."""
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()[-length:]
+    except OSError:
+        return ''
+
+async def orchestrate_scan(chunks, scan_dir, state, state_file, results, on_chunk_done,
+                           parallel=4, nmap_path='nmap', nmap_args=NMAP_SCAN_ARGS,
+                           min_rate=NMAP_MIN_RATE, max_rate=NMAP_MAX_RATE):
+    """Scan the pending chunks with up to `parallel` nmap processes at once.
+    
+    `chunks` maps chunk names to their targets. Each process gets an equal
+    share of --min-rate/--max-rate, taken over the processes that can still
+    run together, so the running processes never exceed the global budget.
+    Every finished chunk's XML is parsed into `results`, recorded in the state
+    file and handed to `on_chunk_done`. Returns the names of failed chunks.
+    """
+    import asyncio
+    
+    slots = asyncio.Semaphore(parallel)
+    pending = list(chunks)
+    running = 0
+    failed = []
+    loop = asyncio.get_running_loop()
+    
+    async def scan_chunk(name):
+        nonlocal running
+        async with slots:
+            pending.remove(name)
+            running += 1
+            processes = min(parallel, running + len(pending))
+            
+            target_file = os.path.join(scan_dir, f"{name}.txt")
+            with open(target_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(chunks[name]) + '\n')
+            output_base = os.path.join(scan_dir, name)
+            command = [nmap_path, *nmap_args, '-iL', target_file, '-oA', output_base]
+            for option, rate in (('--min-rate', min_rate), ('--max-rate', max_rate)):
+                share = rate_share(rate, processes)
+                if share is not None:
+                    command += [option, share]
+            
+            logger.info(f"Scanning {name} ({len(chunks[name])} targets)")
+            started = time.perf_counter()
+            log_file = f"{output_base}.log"
+            try:
+                returncode, message = await run_nmap_chunk(command, log_file), None
+            except OSError as e:
+                # e.g. the nmap executable was not found
+                returncode, message = None, str(e)
+            finally:
+                running -= 1
+            seconds = round(time.perf_counter() - started, 3)
+        
+        xml_file = f"{output_base}.xml"
+        if returncode != 0 or not is_complete_xml(xml_file):
+            if message is None:
+                message = read_log_tail(log_file)
+            logger.error(f"nmap failed on {name} (exit code {returncode}): {message.strip()}")
+            state['chunks'][name] = {'status': 'failed', 'returncode': returncode, 'seconds': seconds}
+            save_scan_state(state_file, state)
+            failed.append(name)
+            return
+        
+        # Parse off the event loop so the other nmap processes keep being serviced
+        chunk_results = await loop.run_in_executor(None, parse_xml_file, xml_file)
+        results.extend(chunk_results)
+        state['chunks'][name] = {'status': 'done', 'open_ports': len(chunk_results), 'seconds': seconds}
+        save_scan_state(state_file, state)
+        logger.info(f"Finished {name}: {len(chunk_results)} open ports in {seconds}s")
+        on_chunk_done(name)
+    
+    await asyncio.gather(*(scan_chunk(name) for name in list(chunks)))
+    return failed
+
+def run_chunked_scan(scope_file, output_file, scan_dir=None, chunk_size=256, parallel=4,
+                     nmap_path='nmap', nmap_args=NMAP_SCAN_ARGS, min_rate=NMAP_MIN_RATE,
+                     max_rate=NMAP_MAX_RATE, output_format='xlsx', workers=None):
+    """Split a scope file into chunks, scan them with concurrent nmap processes and report as they finish.
+    
+    Chunk target lists and their -oA output go to `scan_dir` (default: a
+    <scope>_scan folder next to the scope file) together with a state file, so
+    a rerun after an interruption only scans chunks that did not finish; the
+    results of finished chunks are loaded from their XML. The report is
+    rewritten after every chunk. `nmap_path` may point at any executable that
+    accepts nmap's -iL/-oA/--min-rate/--max-rate options, such as the canned-output
+    segpt_stub_nmap.py used to try the mode without scanning.
+    Returns True if every chunk was scanned successfully.
+    """
+    import asyncio
+    
+    if scan_dir is None:
+        scan_dir = f"{os.path.splitext(os.path.abspath(scope_file))[0]}_scan"
+    os.makedirs(scan_dir, exist_ok=True)
+    
+    targets = read_scope(scope_file)
+    if not targets:
+        logger.error(f"No targets in {scope_file}")
+        return False
+    chunks = {}
+    for number, start in enumerate(range(0, len(targets), chunk_size), start=1):
+        chunks[f"{SCAN_CHUNK_PREFIX}{number:04d}"] = targets[start:start + chunk_size]
+    
+    state_file = os.path.join(scan_dir, SCAN_STATE_FILENAME)
+    try:
+        state = load_scan_state(state_file, targets, chunk_size)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot resume the scan: {e}")
+        return False
+    
+    # Chunks finished by an earlier run are not scanned again
+    done = [
+        name for name in chunks
+        if state['chunks'].get(name, {}).get('status') == 'done'
+        and is_complete_xml(os.path.join(scan_dir, f"{name}.xml"))
+    ]
+    results = ScanResults()
+    if done:
+        logger.info(f"Resuming: {len(done)} of {len(chunks)} chunks already scanned")
+        done_files = [os.path.join(scan_dir, f"{name}.xml") for name in done]
+        results = load_scan_results(done_files, ParseCache(), workers, dedupe_scans=False)
+    pending = {name: chunk for name, chunk in chunks.items() if name not in done}
+    logger.info(
+        f"Scanning {sum(map(len, pending.values()))} targets in {len(pending)} chunks "
+        f"with up to {parallel} nmap processes"
+    )
+    
+    def on_chunk_done(name):
+        replace_report(output_file, results, output_format)
+    
+    try:
+        failed = asyncio.run(orchestrate_scan(
+            pending, scan_dir, state, state_file, results, on_chunk_done,
+            parallel=parallel, nmap_path=nmap_path, nmap_args=nmap_args, min_rate=min_rate, max_rate=max_rate
+        ))
+    except KeyboardInterrupt:
+        logger.warning("Scan interrupted; run the same command again to resume it")
+        return False
+    if len(results) and not pending:
+        replace_report(output_file, results, output_format)
+    
+    if failed:
+        logger.error(f"{len(failed)} chunks failed and will be retried on the next run: {', '.join(failed)}")
+        return False
+    logger.info(f"Scan complete: {len(results)} open ports, report saved to {output_file}")
+    return True
+
+DEFAULT_OUTPUT_NAME = 'NMap_Port_Scan_Result.xlsx'
+OUTPUT_FORMATS = ('xlsx',) + FLAT_OUTPUT_FORMATS
+
+def build_argument_parser():
+    """Return the command line parser."""
+    parser = argparse.ArgumentParser(
+        description="Convert Nmap scan results (.gnmap, .nmap, .xml) into an Excel or CSV port report."
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="result files, directories or glob patterns (default: the folder of this program)")
+    parser.add_argument('-o', '--output',
+                        help=f"report file (default: {DEFAULT_OUTPUT_NAME} next to the program, or in the "
+                             "current directory when inputs are given)")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS,
+                        help="report format (default: taken from the output extension, else xlsx)")
+    parser.add_argument('--no-gui', action='store_true', help="never show popups; print messages instead")
+    parser.add_argument('--no-pivots', action='store_true',
+                        help="leave the By Port, By Service and By Host sheets out of the xlsx report")
+    parser.add_argument('--baseline', nargs='+', metavar='INPUT',
+                        help="results of a previous scan to diff against")
+    parser.add_argument('--workers', type=int, help="parser processes (default: one per CPU core)")
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help="parse every file of an -oA scan instead of only the preferred one")
+    parser.add_argument('--no-cache', action='store_true', help="do not read or write the parse cache")
+    parser.add_argument('--clear-cache', action='store_true', help="empty the parse cache before the run")
+    parser.add_argument('--metrics', metavar='FILE', help="write a JSON run report with stage timings")
+    parser.add_argument('--profile', action='store_true',
+                        help="add memory peaks and a cProfile capture to the run report")
+    parser.add_argument('--watch', action='store_true',
+                        help="follow result files while nmap is still writing them and refresh the report")
+    parser.add_argument('--interval', type=float, default=30.0, metavar='SECONDS',
+                        help="refresh interval of --watch (default: 30)")
+    parser.add_argument('--feed', metavar='FILE',
+                        help="with --watch, append new open ports to this .jsonl or .csv file")
+    parser.add_argument('--until-complete', action='store_true',
+                        help="with --watch, stop once every followed scan has finished")
+    parser.add_argument('--scan', metavar='SCOPE_FILE',
+                        help="run nmap over the targets of this -iL file in concurrent chunks and report as they finish")
+    parser.add_argument('--scan-dir', metavar='DIR',
+                        help="folder for chunk output and resume state (default: <scope>_scan next to the scope file)")
+    parser.add_argument('--chunk-size', type=int, default=256, help="targets per nmap process (default: 256)")
+    parser.add_argument('--parallel', type=int, default=4, help="concurrent nmap processes (default: 4)")
+    parser.add_argument('--nmap', default='nmap', metavar='PATH', help="nmap executable (default: nmap)")
+    parser.add_argument('--nmap-args', metavar='ARGS',
+                        help=f"scan options passed to every nmap process (default: \"{' '.join(NMAP_SCAN_ARGS)}\")")
+    parser.add_argument('--store', metavar='DB',
+                        help="SQLite results store: parsed results are added to it, and --query reads from it")
+    parser.add_argument('--engagement', metavar='NAME',
+                        help="engagement the results are stored under (default: the input folder name); "
+                             "with --query, only search this engagement")
+    parser.add_argument('--query', action='store_true',
+                        help="report open ports from --store instead of parsing inputs (printed unless -o is given)")
+    parser.add_argument('--port', metavar='PORTS', help="with --query, comma-separated port numbers")
+    parser.add_argument('--protocol', choices=SERVICE_PROTOCOLS, help="with --query, only this protocol")
+    parser.add_argument('--service', metavar='NAME', help="with --query, service name such as MS-SQL-S")
+    parser.add_argument('--host', metavar='HOST', help="with --query, host address or glob pattern such as 10.1.*")
+    parser.add_argument('--latest', action='store_true',
+                        help="with --query, only search the latest scan of each engagement")
+    parser.add_argument('--min-rate', type=float, default=NMAP_MIN_RATE,
+                        help=f"global --min-rate shared by the nmap processes, 0 to omit (default: {NMAP_MIN_RATE})")
+    parser.add_argument('--max-rate', type=float, default=NMAP_MAX_RATE,
+                        help=f"global --max-rate shared by the nmap processes, 0 to omit (default: {NMAP_MAX_RATE})")
+    return parser
+
+def program_directory():
+    """Return the folder of this script, or of the executable when frozen."""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+def main(argv=None):
     """Main function."""
+    global GUI_ENABLED
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    if args.no_gui:
+        GUI_ENABLED = False
+    if args.watch and args.baseline:
+        parser.error("--baseline cannot be combined with --watch")
+    if args.scan and (args.inputs or args.watch or args.baseline):
+        parser.error("--scan cannot be combined with inputs, --watch or --baseline")
+    if args.chunk_size < 1 or args.parallel < 1:
+        parser.error("--chunk-size and --parallel must be at least 1")
+    if args.query and (not args.store or args.inputs or args.watch or args.scan or args.baseline):
+        parser.error("--query needs --store and cannot be combined with inputs, --watch, --scan or --baseline")
+    query_ports = None
+    if args.port:
+        try:
+            query_ports = [int(port) for port in args.port.split(',') if port.strip()]
+        except ValueError:
+            parser.error("--port takes comma-separated port numbers")
+    if args.feed and not args.feed.lower().endswith(('.jsonl', '.csv')):
+        parser.error("--feed must be a .jsonl or .csv file")
+    
     try:
         logger.info("Nmap Results to Excel Converter starting...")
         
-        # Get script directory
-        script_dir = os.path.dirname(os.path.abspath(__file__))
+        # Without inputs, process the program's own folder as before
+        script_dir = program_directory()
+        inputs = args.inputs or [script_dir]
+        
+        # Output file and format
+        output_file = args.output
+        if output_file is None:
+            output_name = DEFAULT_OUTPUT_NAME
+            if args.format is not None:
+                output_name = f"{os.path.splitext(output_name)[0]}.{args.format}"
+            output_file = os.path.join(os.getcwd() if args.inputs or args.scan else script_dir, output_name)
+        output_format = args.format
+        if output_format is None:
+            extension = os.path.splitext(output_file)[1].lower().lstrip('.')
+            output_format = extension if extension in OUTPUT_FORMATS else 'xlsx'
+        
+        # Report from the results store instead of parsing
+        if args.query:
+            query_results_store(
+                args.store, args.output, output_format,
+                ports=query_ports,
+                protocol=args.protocol,
+                service=args.service,
+                host=args.host,
+                engagement=args.engagement,
+                latest=args.latest
+            )
+            return 0
+        
+        # Drive nmap over the scope in chunks
+        if args.scan:
+            nmap_args = NMAP_SCAN_ARGS
+            if args.nmap_args is not None:
+                import shlex
+                nmap_args = shlex.split(args.nmap_args, posix=os.name != 'nt')
+            success = run_chunked_scan(
+                args.scan, output_file,
+                scan_dir=args.scan_dir,
+                chunk_size=args.chunk_size,
+                parallel=args.parallel,
+                nmap_path=args.nmap,
+                nmap_args=nmap_args,
+                min_rate=args.min_rate,
+                max_rate=args.max_rate,
+                output_format=output_format,
+                workers=args.workers
+            )
+            if success:
+                print(f"SUCCESS: Scan finished and saved to {output_file}")
+                return 0
+            print("ERROR: The scan did not complete. Check log for details.")
+            return 1
         
-        # Output file
-        output_file = os.path.join(script_dir, 'NMap_Port_Scan_Result.xlsx')
+        # Follow a running scan until it finishes or is interrupted
+        if args.watch:
+            found = watch_nmap_files(
+                inputs, output_file,
+                interval=args.interval,
+                feed_file=args.feed,
+                output_format=output_format,
+                dedupe_scans=not args.no_dedupe,
+                until_complete=args.until_complete
+            )
+            print(f"SUCCESS: {found} open ports reported to {output_file}")
+            return 0
         
         # Process files
-        success = process_nmap_files(script_dir, output_file)
+        success = process_nmap_files(
+            inputs, output_file,
+            workers=args.workers,
+            dedupe_scans=not args.no_dedupe,
+            use_cache=not args.no_cache,
+            clear_cache=args.clear_cache,
+            baseline=args.baseline,
+            metrics_file=args.metrics,
+            profile=args.profile,
+            output_format=output_format,
+            store_file=args.store,
+            engagement=args.engagement,
+            pivot_sheets=not args.no_pivots
+        )
         
         if success:
             logger.info("Task completed successfully.")
-            print("SUCCESS: Nmap results processed and saved to NMap_Port_Scan_Result.xlsx")
+            print(f"SUCCESS: Nmap results processed and saved to {output_file}")
             return 0
         else:
             logger.error("Task failed.")
@@ -491,4 +2900,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen Windows executable
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
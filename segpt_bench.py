@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark harness for the Nmap Results to Excel Converter (segpt.py)
+
+Generates realistic synthetic Nmap output in all three formats (.gnmap, .nmap,
+.xml) for the same fake scan, then times each stage of the converter and
+measures its peak memory. Results are stored as JSON so runs of different
+versions can be compared.
+
+Usage:
+    python segpt_bench.py --hosts 100000 --ports-per-host 8 --output bench.json
+    python segpt_bench.py --hosts 100000 --compare bench_previous.json
+
+Author: Security Team
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import segpt
+
+logger = logging.getLogger(__name__)
+
+# Services with typical products/versions, weighted towards what real scopes expose
+SERVICE_CATALOG = [
+    (22, 'ssh', 'OpenSSH', '8.9p1 Ubuntu 3ubuntu0.6'),
+    (80, 'http', 'Apache httpd', '2.4.52'),
+    (443, 'https', 'nginx', '1.18.0'),
+    (445, 'microsoft-ds', '', ''),
+    (135, 'msrpc', 'Microsoft Windows RPC', ''),
+    (139, 'netbios-ssn', 'Microsoft Windows netbios-ssn', ''),
+    (3389, 'ms-wbt-server', 'Microsoft Terminal Services', ''),
+    (1433, 'ms-sql-s', 'Microsoft SQL Server 2019', '15.00.2000'),
+    (3306, 'mysql', 'MySQL', '8.0.36'),
+    (8080, 'http-proxy', '', ''),
+    (8443, 'https-alt', '', ''),
+    (25, 'smtp', 'Postfix smtpd', ''),
+    (53, 'domain', 'ISC BIND', '9.16.1'),
+    (161, 'snmp', 'net-snmp', ''),
+    (5985, 'wsman', '', '')
+]
+
+SCAN_ARGS = "nmap -sS -Pn -p- -T4 -iL scope.txt -oA open_port"
+SCAN_START = datetime(2024, 1, 1, 0, 0, 0)
+
+def generate_hosts(hosts, ports_per_host, service_density, version_density, noise, ipv6_ratio, seed):
+    """Yield synthetic hosts as (address, hostname, [(port, protocol, state, service, product, version)])."""
+    rng = random.Random(seed)
+
+    for index in range(hosts):
+        if rng.random() < ipv6_ratio:
+            address = f"2001:db8::{index:x}"
+        else:
+            address = f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+        hostname = f"host{index}.corp.example" if rng.random() < 0.3 else ''
+
+        ports = {}
+        for _ in range(max(0, int(rng.gauss(ports_per_host, ports_per_host / 3)))):
+            if rng.random() < 0.6:
+                port, service, product, version = rng.choice(SERVICE_CATALOG)
+            else:
+                port, service, product, version = rng.randint(1, 65535), 'unknown', '', ''
+            # Without service detection nmap only reports a name guess
+            if rng.random() >= service_density:
+                service = ''
+            if rng.random() >= version_density:
+                product, version = '', ''
+            protocol = 'udp' if port in (53, 161) else 'tcp'
+            ports[(port, protocol)] = 'open', service, product, version
+
+        # Filtered/closed entries nmap lists alongside the open ports
+        for _ in range(int(noise)):
+            key = (rng.randint(1, 65535), 'tcp')
+            if key not in ports:
+                ports[key] = rng.choice(['filtered', 'closed']), '', '', ''
+
+        yield address, hostname, [
+            (port, protocol) + ports[(port, protocol)] for port, protocol in sorted(ports)
+        ]
+
+def write_scan_files(base_path, host_records):
+    """Write the same synthetic scan as base_path.gnmap, .nmap and .xml (as nmap -oA would)."""
+    start = SCAN_START.strftime('%a %b %d %H:%M:%S %Y')
+    header = f"# Nmap 7.94 scan initiated {start} as: {SCAN_ARGS}\n"
+    host_count = 0
+
+    with open(f"{base_path}.gnmap", 'w', encoding='utf-8') as gnmap, \
+            open(f"{base_path}.nmap", 'w', encoding='utf-8') as normal, \
+            open(f"{base_path}.xml", 'w', encoding='utf-8') as xml:
+        gnmap.write(header)
+        normal.write(header)
+        xml.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        xml.write(f'<nmaprun scanner="nmap" args="{SCAN_ARGS}" start="1704067200" startstr="{start}" '
+                  f'version="7.94" xmloutputversion="1.05">\n')
+        xml.write('<scaninfo type="syn" protocol="tcp" numservices="65535" services="1-65535"/>\n')
+
+        for address, hostname, ports in host_records:
+            host_count += 1
+            target = f"{address} ({hostname})"
+            gnmap.write(f"Host: {target}\tStatus: Up\n")
+            normal.write(f"Nmap scan report for {f'{hostname} ({address})' if hostname else address}\n")
+            normal.write("Host is up (0.0012s latency).\n")
+            address_type = 'ipv6' if ':' in address else 'ipv4'
+            xml.write(f'<host starttime="1704067200" endtime="1704067260"><status state="up" reason="user-set"/>\n'
+                      f'<address addr="{address}" addrtype="{address_type}"/>\n<hostnames>')
+            if hostname:
+                xml.write(f'<hostname name="{hostname}" type="PTR"/>')
+            xml.write('</hostnames>\n<ports>')
+
+            if ports:
+                listed = len(ports)
+                gnmap.write(f"Host: {target}\tPorts: " + ', '.join(
+                    f"{port}/{state}/{protocol}//{service}//{f'{product} {version}'.strip()}/"
+                    for port, protocol, state, service, product, version in ports
+                ) + f"\tIgnored State: filtered ({65535 - listed})\n")
+
+                normal.write(f"Not shown: {65535 - listed} filtered tcp ports (no-response)\n")
+                normal.write("PORT      STATE    SERVICE       VERSION\n")
+                for port, protocol, state, service, product, version in ports:
+                    line = f"{f'{port}/{protocol}':<9} {state:<8} {service or 'unknown':<13} {f'{product} {version}'.strip()}"
+                    normal.write(line.rstrip() + "\n")
+
+                xml.write(f'<extraports state="filtered" count="{65535 - listed}"/>\n')
+                for port, protocol, state, service, product, version in ports:
+                    attributes = f' name="{service}"' if service else ''
+                    if product:
+                        attributes += f' product="{product}"'
+                    if version:
+                        attributes += f' version="{version}"'
+                    xml.write(f'<port protocol="{protocol}" portid="{port}"><state state="{state}" reason="syn-ack"/>')
+                    if attributes:
+                        xml.write(f'<service{attributes} method="probed" conf="10"/>')
+                    xml.write('</port>\n')
+            xml.write('</ports>\n</host>\n')
+            normal.write("\n")
+
+        gnmap.write(f"# Nmap done at {start} -- {host_count} IP addresses ({host_count} hosts up) scanned in 3600.00 seconds\n")
+        normal.write(f"Nmap done: {host_count} IP addresses ({host_count} hosts up) scanned in 3600.00 seconds\n")
+        xml.write(f'<runstats><finished time="1704070800" timestr="{start}"/>'
+                  f'<hosts up="{host_count}" down="0" total="{host_count}"/></runstats>\n</nmaprun>\n')
+
+def measure(function, *args, trace_memory=True):
+    """Run a stage, returning (result, {wall_seconds, cpu_seconds, peak_memory_bytes})."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = function(*args)
+    metrics = {
+        'wall_seconds': round(time.perf_counter() - wall_start, 4),
+        'cpu_seconds': round(time.process_time() - cpu_start, 4)
+    }
+
+    # Peak memory comes from a second, traced run so tracing does not skew the timings
+    if trace_memory:
+        tracemalloc.start()
+        function(*args)
+        metrics['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, metrics
+
+def gnmap_ranges_match(file_path, count=8):
+    """Check that parsing a .gnmap in byte ranges gives the same rows as parsing it whole.
+
+    Range boundaries are put on "Ports:" lines, where a range's first line
+    holds open ports, as well as on the boundaries gnmap_line_ranges picks.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    ports_lines = []
+    position = data.find(b'\tPorts: ')
+    while position >= 0:
+        ports_lines.append(data.rfind(b'\n', 0, position) + 1)
+        position = data.find(b'\tPorts: ', position + 1)
+    if not ports_lines:
+        return True
+
+    starts = sorted({ports_lines[index * len(ports_lines) // count] for index in range(1, count)})
+    boundaries = [0] + [start for start in starts if start > 0] + [len(data)]
+    range_sets = [list(zip(boundaries, boundaries[1:]))]
+    # Also split where the parallel parser would, however small the file
+    minimum = segpt.GNMAP_MIN_RANGE_BYTES
+    segpt.GNMAP_MIN_RANGE_BYTES = 1
+    try:
+        range_sets.append(segpt.gnmap_line_ranges(file_path, count))
+    finally:
+        segpt.GNMAP_MIN_RANGE_BYTES = minimum
+
+    expected = list(segpt.parse_gnmap_file(file_path))
+    for ranges in range_sets:
+        results = segpt.ScanResults()
+        for start, stop in ranges:
+            segpt.parse_gnmap_file(file_path, results, start, stop)
+        if list(results) != expected:
+            logger.error(f"Ranged .gnmap parse returned {len(results)} rows instead of {len(expected)}")
+            return False
+    return True
+
+def run_benchmark(args):
+    """Generate the synthetic scan, time every stage and return the result document."""
+    work_directory = args.work_dir or tempfile.mkdtemp(prefix='segpt_bench_')
+    os.makedirs(work_directory, exist_ok=True)
+    base_path = os.path.join(work_directory, 'open_port')
+    trace_memory = not args.no_memory
+    stages = {}
+
+    logger.info(f"Generating {args.hosts} synthetic hosts in {work_directory}")
+    _, stages['generate'] = measure(write_scan_files, base_path, generate_hosts(
+        args.hosts, args.ports_per_host, args.service_density, args.version_density,
+        args.noise, args.ipv6_ratio, args.seed
+    ), trace_memory=False)
+
+    input_sizes = {}
+    results = None
+    for stage, extension, parser in (
+        ('parse_gnmap_file', '.gnmap', segpt.parse_gnmap_file),
+        ('parse_xml_file', '.xml', segpt.parse_xml_file),
+        ('parse_nmap_file', '.nmap', segpt.parse_nmap_file)
+    ):
+        file_path = base_path + extension
+        logger.info(f"Timing {stage}")
+        results, stages[stage] = measure(parser, file_path, trace_memory=trace_memory)
+        size = os.path.getsize(file_path)
+        input_sizes[extension] = size
+        stages[stage]['rows'] = len(results)
+        stages[stage]['input_bytes'] = size
+        stages[stage]['mb_per_second'] = round(size / 1e6 / max(stages[stage]['wall_seconds'], 1e-9), 2)
+
+    logger.info("Checking ranged .gnmap parsing")
+    ranges_match = gnmap_ranges_match(base_path + '.gnmap')
+
+    logger.info("Timing build_report_sheets")
+    sheets, stages['build_report_sheets'] = measure(segpt.build_report_sheets, results, trace_memory=trace_memory)
+    stages['build_report_sheets']['rows'] = sum(segpt.table_length(table) for _, table in sheets)
+
+    # The report is written (and styled) in a single streaming pass
+    output_file = os.path.join(work_directory, 'NMap_Port_Scan_Result.xlsx')
+    logger.info("Timing write_excel_report")
+    _, stages['write_excel_report'] = measure(
+        segpt.write_excel_report, output_file, sheets, trace_memory=trace_memory
+    )
+    stages['write_excel_report']['output_bytes'] = os.path.getsize(output_file)
+
+    with open(segpt.__file__, 'rb') as f:
+        source_hash = hashlib.sha1(f.read()).hexdigest()
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'segpt_sha1': source_hash,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'hosts': args.hosts,
+            'ports_per_host': args.ports_per_host,
+            'service_density': args.service_density,
+            'version_density': args.version_density,
+            'noise': args.noise,
+            'ipv6_ratio': args.ipv6_ratio,
+            'seed': args.seed
+        },
+        'input_bytes': input_sizes,
+        'checks': {'gnmap_ranges_match': ranges_match},
+        'stages': stages
+    }
+
+def compare_benchmarks(previous, current, threshold):
+    """Print per-stage wall time and memory changes; return True if any stage regressed past `threshold`."""
+    regressed = False
+    print(f"{'stage':<22} {'wall before':>12} {'wall now':>10} {'change':>8}   {'peak MB before':>14} {'peak MB now':>11}")
+    for stage, metrics in current['stages'].items():
+        before = previous['stages'].get(stage)
+        if before is None:
+            continue
+        change = (metrics['wall_seconds'] - before['wall_seconds']) / max(before['wall_seconds'], 1e-9)
+        if change > threshold and stage != 'generate':
+            regressed = True
+        peak_before = before.get('peak_memory_bytes')
+        peak_now = metrics.get('peak_memory_bytes')
+        print(
+            f"{stage:<22} {before['wall_seconds']:>12.3f} {metrics['wall_seconds']:>10.3f} {change:>+8.1%}   "
+            f"{'-' if peak_before is None else f'{peak_before / 1e6:.1f}':>14} "
+            f"{'-' if peak_now is None else f'{peak_now / 1e6:.1f}':>11}"
+        )
+    if previous['parameters'] != current['parameters']:
+        print("WARNING: benchmark parameters differ between the two runs")
+    return regressed
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark segpt.py on synthetic Nmap output.")
+    parser.add_argument('--hosts', type=int, default=10000, help="number of scanned hosts (default: 10000)")
+    parser.add_argument('--ports-per-host', type=float, default=5, help="mean open ports per host (default: 5)")
+    parser.add_argument('--service-density', type=float, default=0.8,
+                        help="share of ports with a detected service name (default: 0.8)")
+    parser.add_argument('--version-density', type=float, default=0.5,
+                        help="share of ports with product/version info (default: 0.5)")
+    parser.add_argument('--noise', type=float, default=2,
+                        help="filtered/closed ports listed per host (default: 2)")
+    parser.add_argument('--ipv6-ratio', type=float, default=0.05, help="share of IPv6 targets (default: 0.05)")
+    parser.add_argument('--seed', type=int, default=1337, help="random seed (default: 1337)")
+    parser.add_argument('--work-dir', help="directory for generated files (default: a new temp directory)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak memory runs")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="wall time increase reported as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    result = run_benchmark(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Results saved to {args.output}")
+    else:
+        print(json.dumps(result, indent=2))
+
+    if not all(result['checks'].values()):
+        print("FAILED: " + ', '.join(name for name, passed in result['checks'].items() if not passed))
+        return 1
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if compare_benchmarks(previous, result, args.threshold):
+            print("REGRESSION: at least one stage is slower than the threshold allows")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stub nmap executable for exercising segpt.py --scan without scanning anything
+
+Accepts the command line segpt.py builds (-iL TARGETS -oA BASE plus any other
+options) and writes canned -oA output for the listed targets: every target has
+TCP/22 (ssh), TCP/443 (https) and UDP/161 open. Environment variables shape a run:
+
+    SEGPT_STUB_SLEEP   seconds to "scan" each chunk (default: 0.5)
+    SEGPT_STUB_FAIL    exit with an error when this target is in the chunk
+    SEGPT_STUB_CALLS   append one JSON line per call (pid, start, end, argv)
+                       to this file, to check concurrency and rate shares
+
+Usage:
+    python segpt.py --scan scope.txt --nmap ./segpt_stub_nmap.py --parallel 4 --chunk-size 64
+
+Author: Security Team
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+CANNED_PORTS = [
+    ('tcp', 22, 'ssh'),
+    ('tcp', 443, 'https'),
+    ('udp', 161, 'snmp')
+]
+
+def option_value(argv, option):
+    """Return the value following `option` on the command line, or None."""
+    try:
+        return argv[argv.index(option) + 1]
+    except (ValueError, IndexError):
+        return None
+
+def write_outputs(base, argv, targets, started):
+    """Write the .xml, .gnmap and .nmap files of a -oA run."""
+    command = ' '.join(['nmap'] + argv)
+    startstr = started.strftime('%a %b %d %H:%M:%S %Y')
+
+    hosts = []
+    for target in targets:
+        ports = ''.join(
+            f'<port protocol="{protocol}" portid="{port}"><state state="open" reason="syn-ack"/>'
+            f'<service name="{service}" method="table" conf="3"/></port>'
+            for protocol, port, service in CANNED_PORTS
+        )
+        hosts.append(
+            f'<host><status state="up" reason="user-set"/><address addr="{target}" addrtype="ipv4"/>'
+            f'<ports>{ports}</ports></host>\n'
+        )
+    with open(f"{base}.xml", 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<nmaprun scanner="nmap" args="{command}" start="{int(started.timestamp())}" '
+                f'startstr="{startstr}" version="7.94" xmloutputversion="1.05">\n')
+        f.writelines(hosts)
+        f.write(f'<runstats><finished summary="Nmap done; {len(targets)} IP addresses scanned"/></runstats>\n')
+        f.write('</nmaprun>\n')
+
+    with open(f"{base}.gnmap", 'w', encoding='utf-8') as f:
+        f.write(f"# Nmap 7.94 scan initiated {startstr} as: {command}\n")
+        for target in targets:
+            ports = ', '.join(f"{port}/open/{protocol}//{service}///" for protocol, port, service in CANNED_PORTS)
+            f.write(f"Host: {target} ()\tStatus: Up\n")
+            f.write(f"Host: {target} ()\tPorts: {ports}\n")
+        f.write(f"# Nmap done at {startstr} -- {len(targets)} IP addresses scanned\n")
+
+    with open(f"{base}.nmap", 'w', encoding='utf-8') as f:
+        f.write(f"# Nmap 7.94 scan initiated {startstr} as: {command}\n")
+        for target in targets:
+            f.write(f"Nmap scan report for {target}\nHost is up.\n\nPORT     STATE SERVICE\n")
+            for protocol, port, service in CANNED_PORTS:
+                f.write(f"{f'{port}/{protocol}':<8} open  {service}\n")
+            f.write("\n")
+        f.write(f"# Nmap done at {startstr} -- {len(targets)} IP addresses scanned\n")
+
+def main():
+    argv = sys.argv[1:]
+    target_file = option_value(argv, '-iL')
+    base = option_value(argv, '-oA')
+    if target_file is None or base is None:
+        sys.stderr.write("segpt_stub_nmap: -iL and -oA are required\n")
+        return 1
+
+    with open(target_file, 'r', encoding='utf-8') as f:
+        targets = f.read().split()
+
+    started = datetime.now()
+    start = time.time()
+    print(f"Starting Nmap 7.94 ( stub ) at {started:%Y-%m-%d %H:%M}", flush=True)
+    time.sleep(float(os.environ.get('SEGPT_STUB_SLEEP', '0.5')))
+
+    failed = os.environ.get('SEGPT_STUB_FAIL') in targets
+    if failed:
+        sys.stderr.write(f"segpt_stub_nmap: simulated failure on {os.environ['SEGPT_STUB_FAIL']}\n")
+    else:
+        write_outputs(base, argv, targets, started)
+
+    calls_file = os.environ.get('SEGPT_STUB_CALLS')
+    if calls_file:
+        with open(calls_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'pid': os.getpid(), 'start': start, 'end': time.time(), 'argv': argv}) + '\n')
+    return 2 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())